@@ -11,7 +11,7 @@
 #                                                                         #
 # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
 
-from typing import Union, List
+from typing import Union, List, Optional, Sequence, Tuple, final
 
 from token import Token
 
@@ -19,9 +19,10 @@ from token import Token
 class AST:
     """Abstract-syntax tree (AST)"""
 
-    pass
+    __slots__ = ()
 
 
+@final
 class Program(AST):
     """Represents 'program' keyword and will be the root of the tree.
 
@@ -33,28 +34,37 @@ class Program(AST):
         and the assignments made within 'BEGIN'
     """
 
+    __slots__ = ("name", "block")
+
     def __init__(self, name: str, block: "Block") -> None:
         self.name = name
         self.block = block
 
 
+@final
 class Block(AST):
     """Holds the declarations and compound statements.
 
     Args:
-        declarations (VarDeclaration): object containing the declaration of variables list
+        declarations (Sequence[VarDeclaration]): the declarations of variables. They
+        are stored as a tuple
 
         compound_statement (Compound): object with a list of compound instructions that
         are between 'BEGIN' and 'END'
     """
 
+    __slots__ = ("declarations", "compound_statement")
+
     def __init__(
-        self, declarations: "VarDeclaration", compound_statement: "Compound"
+        self,
+        declarations: Sequence["VarDeclaration"],
+        compound_statement: "Compound",
     ) -> None:
-        self.declarations = declarations
+        self.declarations: Tuple["VarDeclaration", ...] = tuple(declarations)
         self.compound_statement = compound_statement
 
 
+@final
 class VarDeclaration(AST):
     """Represents a declaration of variable.
 
@@ -65,11 +75,14 @@ class VarDeclaration(AST):
         type_node (Type): the type of the variable which represents the node in the tree
     """
 
+    __slots__ = ("var_node", "type_node")
+
     def __init__(self, var_node: "Var", type_node: "Type") -> None:
         self.var_node = var_node
         self.type_node = type_node
 
 
+@final
 class Type(AST):
     """Represents a variable type.
 
@@ -77,11 +90,14 @@ class Type(AST):
         token (Token): a specific token: Token(INTEGER, 2) or Token(REAL, 3.14)
     """
 
+    __slots__ = ("token", "value")
+
     def __init__(self, token: Token) -> None:
         self.token = token
         self.value = token.value
 
 
+@final
 class BinaryOperator(AST):
     """Represents BINARY operations of the AST
     Examples: 2 + 3
@@ -97,14 +113,23 @@ class BinaryOperator(AST):
             right number of operation
     """
 
+    __slots__ = ("left", "token", "right")
+
     def __init__(
         self, left, operator, right
     ):  # type: (Union[Var, Num, Boolean, String, BinaryOperator, UnaryOperator, None], Token, Union[Var, Num, Boolean, String, BinaryOperator, UnaryOperator, None]) -> None
         self.left = left
-        self.token = self.operator = operator
+        self.token = operator
         self.right = right
 
+    @property
+    def operator(self) -> Token:
+        """The operator token, stored only once in 'token'."""
 
+        return self.token
+
+
+@final
 class UnaryOperator(AST):
     """Represents UNARY operations of the AST
     Examples: 5 -- 2 = 7
@@ -117,14 +142,25 @@ class UnaryOperator(AST):
             tree node
     """
 
+    __slots__ = ("token", "expression")
+
     def __init__(
         self, operator, expression
     ):  # type: (Token, Union[Var, Num, Boolean, String, BinaryOperator, UnaryOperator, None]) -> None
-        self.token = self.operator = operator
+        self.token = operator
         self.expression = expression
 
+    @property
+    def operator(self) -> Token:
+        """The operator token, stored only once in 'token'."""
 
+        return self.token
+
+
+@final
 class Num(AST):
+    __slots__ = ("token", "value")
+
     def __init__(self, token: Token) -> None:
         """Represents the INTEGER numbers of the AST
 
@@ -135,7 +171,10 @@ class Num(AST):
         self.value = token.value
 
 
+@final
 class String(AST):
+    __slots__ = ("token", "value")
+
     def __init__(self, token: Token) -> None:
         """Represents the STRING type of the AST
 
@@ -146,7 +185,10 @@ class String(AST):
         self.value = token.value
 
 
+@final
 class Boolean(AST):
+    __slots__ = ("token", "value")
+
     def __init__(self, token: Token) -> None:
         """Represents the BOOLEAN type of the AST
 
@@ -158,13 +200,24 @@ class Boolean(AST):
         self.value = token.value
 
 
+@final
 class Compound(AST):
-    """Represents a 'program ... END' block."""
+    """Represents a 'program ... END' block.
+
+    Args:
+        children (Optional[Sequence[Assign]], optional): the statements of the block.
+        They are stored as a tuple. Defaults to no statements.
+    """
+
+    __slots__ = ("children",)
 
-    def __init__(self) -> None:
-        self.children: List["Assign"] = []
+    def __init__(self, children: Optional[Sequence["Assign"]] = None) -> None:
+        self.children: Tuple["Assign", ...] = (
+            () if children is None else tuple(children)
+        )
 
 
+@final
 class Var(AST):
     """The Var node is constructed out of ID token.
 
@@ -173,11 +226,16 @@ class Var(AST):
             Example: Token(TokenType.ID, 'Part11', position=1:17)
     """
 
+    __slots__ = ("token", "value", "_symbol")
+
     def __init__(self, token: Token) -> None:
         self.token = token
         self.value = token.value
+        # Symbol of the variable, resolved by the Semantic Handler when visiting it
+        self._symbol = None
 
 
+@final
 class Assign(AST):
     """Represents the assignment between a variable, the operator ':=' and
     an expression.
@@ -189,6 +247,8 @@ class Assign(AST):
             a number that makes up the expression to be assigned to variable
     """
 
+    __slots__ = ("left", "token", "right")
+
     def __init__(
         self,
         left: Var,
@@ -196,10 +256,17 @@ class Assign(AST):
         right: Union[Var, Num, Boolean, String, BinaryOperator, UnaryOperator, None],
     ) -> None:
         self.left = left
-        self.token = self.operator = operator
+        self.token = operator
         self.right = right
 
+    @property
+    def operator(self) -> Token:
+        """The operator token, stored only once in 'token'."""
+
+        return self.token
 
+
+@final
 class Writeln(AST):
     """Represents the 'writeln' command.
 
@@ -208,13 +275,16 @@ class Writeln(AST):
             the 'writeln' content
     """
 
+    __slots__ = ("content",)
+
     def __init__(
         self, content
     ):  # type: (List[Union[Var, Num, String, Boolean, BinaryOperator, UnaryOperator, None]]) -> None
         self.content = content
 
 
+@final
 class Empty(AST):
     """Represents an empty statement"""
 
-    pass
+    __slots__ = ()
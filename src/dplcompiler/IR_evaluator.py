@@ -1,25 +1,107 @@
 import os
+import hashlib
 import llvmlite.binding as llvm
-from typing import Any
+from queue import Queue
+from threading import Thread
+from typing import Any, Dict, Optional
 from ctypes import CFUNCTYPE, c_double
 
 from code_generator import CodeGenerator
 from AST import Program
-from symbols import SymbolTable
+from semantic_handler import SemanticHandler
+from compilation_cache import CompilationCache
 
 
 class IREvaluator:
-    def __init__(
-        self, tree: Program, symbol_table: SymbolTable, source_file: str
-    ) -> None:
-        llvm.initialize()
-        llvm.initialize_all_targets()
-        llvm.initialize_all_asmprinters()
+    # LLVM is initialized once for all the evaluators
+    _initialized = False
+    _target: Optional[llvm.Target] = None
+    # Modules with fewer instructions are compiled without running the optimizations,
+    # which would cost more than they save
+    MIN_OPTIMIZED_INSTRUCTIONS = 16
+
+    def __init__(self, tree: Program, source_file: str) -> None:
+        if not IREvaluator._initialized:
+            llvm.initialize()
+            llvm.initialize_native_target()
+            llvm.initialize_native_asmprinter()
+            IREvaluator._target = llvm.Target.from_triple(llvm.get_default_triple())
+            IREvaluator._initialized = True
 
         self.tree = tree
-        self.codegen = CodeGenerator(symbol_table)
+        self.codegen: Optional[CodeGenerator] = None
         self.source_file = source_file
-        self.target = llvm.Target.from_triple(llvm.get_default_triple())
+        self.target = IREvaluator._target
+        # Each evaluator owns its host target machine and the pass managers built for
+        # it. The pass managers hold the target analyses of the machine, so they are
+        # set first and released before it.
+        self._pm_cache: Dict[int, llvm.ModulePassManager] = {}
+        self.target_machine = self.target.create_target_machine(
+            llvm.get_host_cpu_name()
+        )
+        # The machine code is built for the host, so the target, the CPU, its features
+        # and the version of LLVM are part of the key of the object cache
+        try:
+            cpu_features = llvm.get_host_cpu_features().flatten()
+        except RuntimeError:
+            cpu_features = ""
+        llvm_version = ".".join(map(str, llvm.llvm_version_info))
+        self._host_key = (
+            f"{self.target_machine.triple}:{llvm.get_host_cpu_name()}:{cpu_features}"
+            f":{llvm_version}"
+        )
+        # Unoptimized LLVM IR and its entry function, either generated from the tree
+        # or loaded from the compilation cache
+        self.ir_code: Optional[str] = None
+        self._ir_hash = None
+        self.func_name = ""
+        # Generated code waiting to be saved by the I/O thread, which writes it while
+        # the module is optimized and compiled
+        self._pending_code: Optional[Queue] = None
+        # The MCJIT engine lives as long as the evaluator, each evaluation only adds
+        # its module. The machine code of a module is kept in the object cache, keyed
+        # by the hash of the IR and of the compilation options. The engine takes
+        # ownership of the target machine it is given and frees it with itself, so
+        # it gets one of its own.
+        self.engine = llvm.create_mcjit_compiler(
+            llvm.parse_assembly(""),
+            self.target.create_target_machine(llvm.get_host_cpu_name()),
+        )
+        # The empty module is compiled now, so it never reaches the object cache
+        self.engine.finalize_object()
+        self.engine.set_object_cache(self._save_object_code, self._load_object_code)
+        self._object_path: Optional[str] = None
+        # Entry function of each program compiled in the engine, keyed by the hash of
+        # its IR and compilation options. The compiled code stays in the engine, so
+        # running the same program again is a single call.
+        self._entry_functions: Dict[str, Any] = {}
+
+    def _get_pass_manager(self, opt_level: int) -> llvm.ModulePassManager:
+        """Returns the module pass manager of an optimization level, building it on
+        the first request. Loop and SLP vectorization are enabled and the target
+        analysis passes of the host machine are added, so the cost models know the
+        host CPU.
+
+        Args:
+            opt_level (int): optimization level (0-3)
+
+        Returns:
+            llvm.ModulePassManager: pass manager populated for the given level
+        """
+
+        module_pass_mger = self._pm_cache.get(opt_level)
+        if module_pass_mger is None:
+            pass_mger_builder = llvm.create_pass_manager_builder()
+            pass_mger_builder.opt_level = opt_level
+            pass_mger_builder.size_level = 0
+            pass_mger_builder.loop_vectorize = True
+            pass_mger_builder.slp_vectorize = True
+            module_pass_mger = llvm.create_module_pass_manager()
+            self.target_machine.add_analysis_passes(module_pass_mger)
+            pass_mger_builder.populate(module_pass_mger)
+            self._pm_cache[opt_level] = module_pass_mger
+
+        return module_pass_mger
 
     def _save_code(self, source_module: str, file_name: str, extension: str) -> None:
         """Saves the generated code.
@@ -38,73 +120,327 @@ class IREvaluator:
         with open(f"{os.path.join(dist_dir, file_name)}.{extension}", "w") as code:
             code.write(source_module)
 
-    def _optimize_module(self, optimize: bool, llvmdump: bool, source_module) -> None:
-        """performs intermediate code level 2 optimization.
+    def _emit_code(self, source_module: str, file_name: str, extension: str) -> None:
+        """Schedules the saving of the generated code on the I/O thread. Nothing is
+        saved when the code is not being emitted.
+
+        Args:
+            source_module (str): source code that will be saved
+            file_name (str): file name of the generated code
+            extension (str): extension file
+        """
+
+        if self._pending_code is not None:
+            self._pending_code.put((source_module, file_name, extension))
+
+    def _save_pending_code(self, pending_code: Queue) -> None:
+        """Saves the generated code put in the queue until it receives None.
+
+        Args:
+            pending_code (Queue): generated code waiting to be saved
+        """
+
+        for code in iter(pending_code.get, None):
+            self._save_code(*code)
+
+    def _get_code_key(self, optimize: bool, opt_level: int) -> str:
+        """Returns the key of the machine code of the current LLVM IR, the hash of the
+        IR, of the host and of the compilation options.
+
+        Args:
+            optimize (bool): flag to indicate the optimization
+            opt_level (int): optimization level (0-3)
+
+        Returns:
+            str: SHA-256 hash of the IR, of the host and of the compilation options
+        """
+
+        options = f"\n{self._host_key}:{opt_level if optimize else -1}:{self.func_name}"
+
+        # The IR is hashed once, only the options are added for each evaluation
+        code_hash = self._ir_hash.copy()
+        code_hash.update(options.encode("utf-8"))
+
+        return code_hash.hexdigest()
+
+    def _load_object_code(self, module: llvm.ModuleRef) -> Optional[bytes]:
+        """Object cache callback, returns the machine code of the module when it was
+        already compiled.
+
+        Args:
+            module (llvm.ModuleRef): module being compiled by the engine
+
+        Returns:
+            Optional[bytes]: the cached machine code, None if it must be generated
+        """
+
+        if self._object_path is None:
+            return None
+
+        try:
+            with open(self._object_path, "rb") as object_code:
+                return object_code.read()
+        except OSError:
+            return None
+
+    def _save_object_code(self, module: llvm.ModuleRef, object_code: bytes) -> None:
+        """Object cache callback, stores the machine code generated for the module.
+
+        Args:
+            module (llvm.ModuleRef): module compiled by the engine
+            object_code (bytes): the generated machine code
+        """
+
+        if self._object_path is None:
+            return
+
+        try:
+            os.makedirs(os.path.dirname(self._object_path), mode=0o700, exist_ok=True)
+            # The object file is loaded as is by the engine, so it is written to a
+            # temporary file and only then renamed: a partial file is never loaded
+            temp_path = f"{self._object_path}.{os.getpid()}.tmp"
+            with open(temp_path, "wb") as cached:
+                cached.write(object_code)
+            os.replace(temp_path, self._object_path)
+        except OSError:
+            # The cache is only an optimization, the program still runs
+            pass
+
+    def _is_worth_optimizing(self, source_module: llvm.ModuleRef) -> bool:
+        """Checks if the module has at least MIN_OPTIMIZED_INSTRUCTIONS instructions.
+
+        Args:
+            source_module (llvm.ModuleRef): the module that will be optimized
+
+        Returns:
+            bool: True when the optimizations should run
+        """
+
+        instructions = 0
+        for function in source_module.functions:
+            for block in function.blocks:
+                for _ in block.instructions:
+                    instructions += 1
+                    if instructions >= self.MIN_OPTIMIZED_INSTRUCTIONS:
+                        return True
+
+        return False
+
+    def _optimize_module(
+        self, optimize: bool, llvmdump: bool, source_module, opt_level: int = 3
+    ) -> None:
+        """performs intermediate code optimization.
 
         Args:
             optimize (bool): flag to indicate the optimization
             llvmdump (bool): flag to indicate the impression of the results achieved
             source_module: the source module that will be optimized
+            opt_level (int, optional): optimization level (0-3). Defaults to 3.
         """
 
         if optimize:
-            pass_mger_builder = llvm.create_pass_manager_builder()
-            pass_mger_builder.opt_level = 2
-            module_pass_mger = llvm.create_module_pass_manager()
-            pass_mger_builder.populate(module_pass_mger)
-            module_pass_mger.run(source_module)
+            if self._is_worth_optimizing(source_module):
+                module_pass_mger = self._get_pass_manager(opt_level)
+                module_pass_mger.run(source_module)
+
+            # The optimized module is only turned back into text when it is shown
+            # or saved
+            if llvmdump or self._pending_code is not None:
+                str_source_module = str(source_module)
+                self._emit_code(str_source_module, "_optz_ir_dpl", "ll")
+
+                if llvmdump:
+                    print("\n======== Optimized LLVM IR ========\n")
+                    print(str_source_module)
+
+    def load_ir(self, ir_code: str, func_name: str) -> None:
+        """Uses an already generated LLVM IR instead of transforming the AST again.
 
-            str_source_module = str(source_module)
-            self._save_code(str_source_module, "_optz_ir_dpl", "ll")
+        Args:
+            ir_code (str): unoptimized LLVM IR of the program
+            func_name (str): name of the function called by the JIT
+        """
+
+        self.ir_code = ir_code
+        self._ir_hash = hashlib.sha256(ir_code.encode("utf-8"))
+        self.func_name = func_name
+
+    def generate_ir(self, semantic_handler: Optional[SemanticHandler] = None) -> str:
+        """Semantically validates the AST and transforms it into LLVM IR, in a single
+        walk over the tree.
 
-            if llvmdump:
-                print("\n======== Optimized LLVM IR ========\n")
-                print(str_source_module)
+        Args:
+            semantic_handler (Optional[SemanticHandler], optional): handler that
+            performs the semantic checks and fills the Symbol Table. Defaults to a
+            new SemanticHandler.
+
+        Returns:
+            str: the unoptimized LLVM IR of the program
+        """
 
-    def evaluate(self, optimize: bool, llvmdump: bool) -> Any:
+        self.codegen = CodeGenerator(semantic_handler or SemanticHandler())
+        self.codegen.visit(self.tree)
+        self.codegen.module.triple = self.target.triple
+        self.codegen.module.name = self.source_file
+        self.func_name = self.codegen.func_name
+        # The module is turned into text once, the same text is dumped, saved, hashed
+        # and parsed by LLVM
+        self.ir_code = str(self.codegen.module)
+        self._ir_hash = hashlib.sha256(self.ir_code.encode("utf-8"))
+
+        return self.ir_code
+
+    def evaluate(
+        self,
+        optimize: bool,
+        llvmdump: bool,
+        opt_level: int = 3,
+        emit_code: bool = False,
+        cache: bool = True,
+    ) -> Any:
         """Validates the AST already transformed into LLVM IR, calls the responsible
         method to optimize the code and turns it into Machine code.
 
+        The generated code is saved in the dist directory only when it is dumped or
+        explicitly emitted, and the files are written by a background thread so the
+        disk I/O does not hold up the JIT.
+
         Args:
             optimize (bool): flag to indicate the optimization
             llvmdump (bool): flag to indicate the impression of the results achieved
             by the LLVM
+            opt_level (int, optional): optimization level (0-3). Defaults to 3.
+            emit_code (bool, optional): flag to save the LLVM IR and the assembly
+            code. Defaults to False.
+            cache (bool, optional): flag to reuse and store the machine code in the
+            object cache. Defaults to True.
         """
 
-        self.codegen.visit(self.tree)
-        self.codegen.module.triple = self.target.triple
-        self.codegen.module.name = self.source_file
+        if not (llvmdump or emit_code):
+            return self._compile_and_run(optimize, llvmdump, opt_level, cache)
+
+        self._pending_code = Queue()
+        io_thread = Thread(target=self._save_pending_code, args=(self._pending_code,))
+        io_thread.start()
+
+        try:
+            return self._compile_and_run(optimize, llvmdump, opt_level, cache)
+        finally:
+            self._pending_code.put(None)
+            self._pending_code = None
+            io_thread.join()
+
+    def _compile_and_run(
+        self, optimize: bool, llvmdump: bool, opt_level: int, cache: bool
+    ) -> Any:
+        """Optimizes the LLVM IR, compiles it to machine code and calls the entry
+        function.
+
+        Args:
+            optimize (bool): flag to indicate the optimization
+            llvmdump (bool): flag to indicate the impression of the results achieved
+            by the LLVM
+            opt_level (int): optimization level (0-3)
+            cache (bool): flag to use the object cache
+        """
+
+        if self.ir_code is None:
+            self.generate_ir()
 
-        str_source_module = str(self.codegen.module)
+        str_source_module = self.ir_code
 
         if llvmdump:
             print("\n======== Unoptimized LLVM IR ========\n")
             print(str_source_module)
 
-        self._save_code(str_source_module, "unoptz_ir_dpl", "ll")
+        self._emit_code(str_source_module, "unoptz_ir_dpl", "ll")
+
+        show_code = llvmdump or self._pending_code is not None
+        code_key = self._get_code_key(optimize, opt_level)
+        entry_function = self._entry_functions.get(code_key)
 
-        # Convert LLVM IR into in-memory representation
-        llvmmod = llvm.parse_assembly(str(self.codegen.module))
+        # The program was already compiled by this evaluator
+        if entry_function is not None and not show_code:
+            return entry_function()
 
-        # Optimize the module
-        self._optimize_module(optimize, llvmdump, llvmmod)
+        # The object files are loaded as machine code, so they are only used from a
+        # directory that nobody else can write to
+        if cache and CompilationCache.is_private(CompilationCache.CACHE_DIR):
+            self._object_path = os.path.join(
+                CompilationCache.CACHE_DIR, f"{code_key}.o"
+            )
 
-        cpu = llvm.get_host_cpu_name()
-        target_machine = self.target.create_target_machine(cpu)
-        with llvm.create_mcjit_compiler(llvmmod, target_machine) as mcjit_c:
-            mcjit_c.finalize_object()
+        try:
+            # When the code is not shown, cached machine code is loaded straight into
+            # the engine, without parsing and optimizing the IR
+            if entry_function is None and not show_code:
+                entry_address = self._load_object_file(self._object_path)
+                if entry_address is not None:
+                    return self._call_entry_function(code_key, entry_address)
 
-            asm_code = target_machine.emit_assembly(llvmmod)
+            # Convert LLVM IR into in-memory representation
+            llvmmod = llvm.parse_assembly(str_source_module)
 
-            if llvmdump:
-                print("\n======== Machine code ========\n")
-                print(asm_code)
+            # Optimize the module
+            self._optimize_module(optimize, llvmdump, llvmmod, opt_level)
 
-            self._save_code(asm_code, "asm_dpl", "asm")
+            if entry_function is None:
+                self.engine.add_module(llvmmod)
+                self.engine.finalize_object()
 
-            fptr = CFUNCTYPE(c_double)(
-                mcjit_c.get_function_address(self.codegen.func_name)
-            )
+            if show_code:
+                asm_code = self.target_machine.emit_assembly(llvmmod)
+
+                if llvmdump:
+                    print("\n======== Machine code ========\n")
+                    print(asm_code)
+
+                self._emit_code(asm_code, "asm_dpl", "asm")
+        finally:
+            self._object_path = None
+
+        if entry_function is not None:
+            return entry_function()
+
+        return self._call_entry_function(
+            code_key, self.engine.get_function_address(self.func_name)
+        )
+
+    def _load_object_file(self, object_path: Optional[str]) -> Optional[int]:
+        """Adds the cached machine code of the program to the engine.
+
+        Args:
+            object_path (Optional[str]): path of the object file in the cache
+
+        Returns:
+            Optional[int]: address of the entry function, None when the machine code
+            is not cached
+        """
+
+        if object_path is None or not os.path.exists(object_path):
+            return None
+
+        try:
+            self.engine.add_object_file(object_path)
+            self.engine.finalize_object()
+        except RuntimeError:
+            # Unreadable object file, the program is compiled again
+            return None
+
+        return self.engine.get_function_address(self.func_name)
+
+    def _call_entry_function(self, code_key: str, entry_address: int) -> Any:
+        """Keeps the entry function of a program compiled in the engine and calls it.
+
+        Args:
+            code_key (str): key of the machine code of the program
+            entry_address (int): address of the entry function
+
+        Returns:
+            Any: value returned by the entry function
+        """
+
+        entry_function = CFUNCTYPE(c_double)(entry_address)
+        self._entry_functions[code_key] = entry_function
 
-            result = fptr()
-            return result
+        return entry_function()
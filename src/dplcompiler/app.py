@@ -20,6 +20,7 @@ from parser import Parser
 from handler import Handler
 from semantic_handler import SemanticHandler
 from IR_evaluator import IREvaluator
+from compilation_cache import CompilationCache
 
 from exceptions.error import ParserError, TokenizeError, SemanticError
 
@@ -39,7 +40,27 @@ def set_cli():
     argparser.add_argument(
         "-optz", action="store_true", default=True, help="Optimize the LLVM IR code."
     )
+    argparser.add_argument(
+        "-olevel",
+        type=int,
+        default=3,
+        choices=range(4),
+        help="Optimization level of the LLVM IR code (0-3).",
+    )
     argparser.add_argument("-llvmd", action="store_true", help="Display LLVM results")
+    argparser.add_argument(
+        "-emitir",
+        action="store_true",
+        help="Save the LLVM IR and the assembly code in the dist directory",
+    )
+    argparser.add_argument(
+        "-nocache", action="store_true", help="Ignore the compilation cache"
+    )
+    argparser.add_argument(
+        "-interpret",
+        action="store_true",
+        help="Also run the program with the tree-walk interpreter (Handler)",
+    )
     args = argparser.parse_args()
     return args
 
@@ -51,26 +72,58 @@ def start():
     show_symtab = args.sb
     show_list_tokens = args.lt
     optimize_ir_code = args.optz
+    optimization_level = args.olevel
     show_llvm_result = args.llvmd
-    source_code = open(sourcefile, "r").read()
+    emit_code = args.emitir
+    use_cache = not args.nocache
+    interpret = args.interpret
+
+    # The file is read in a single call and decoded once. The newlines are translated
+    # as the text mode would, but only when the file has carriage returns.
+    with open(sourcefile, "rb") as source_file:
+        source_bytes = source_file.read()
+    source_code = source_bytes.decode("utf-8")
+    if "\r" in source_code:
+        source_code = source_code.replace("\r\n", "\n").replace("\r", "\n")
+
+    cache = CompilationCache(source_bytes)
+    cached = cache.load() if use_cache else None
 
     try:
-        tokenizer = Tokenizer(source_code)
-        parser = Parser(tokenizer)
-        tree = parser.parse()
-        semantic_handler = SemanticHandler()
-        semantic_handler.visit(tree)
+        if cached is None:
+            tokenizer = Tokenizer(source_code)
+            parser = Parser(tokenizer)
+            tree = parser.parse()
+            semantic_handler = SemanticHandler()
+            symbol_table = semantic_handler.symbol_table
+            evalutor = IREvaluator(tree, sourcefile)
+            # The semantic checks run together with the IR generation
+            evalutor.generate_ir(semantic_handler)
+        else:
+            tree, symbol_table, ir_code, func_name = cached
+            evalutor = IREvaluator(tree, sourcefile)
+            evalutor.load_ir(ir_code, func_name)
 
         if show_symtab:
-            print(semantic_handler.symbol_table)
+            print(symbol_table)
 
         if show_list_tokens:
-            print(semantic_handler.symbol_table.list_tokens())
+            print(symbol_table.list_tokens())
+
+        if interpret:
+            handler = Handler(tree)
+            handler.handle()
+
+        evalutor.evaluate(
+            optimize=optimize_ir_code,
+            llvmdump=show_llvm_result,
+            opt_level=optimization_level,
+            emit_code=emit_code,
+            cache=use_cache,
+        )
 
-        handler = Handler(tree)
-        handler.handle()
-        evalutor = IREvaluator(tree, semantic_handler.symbol_table, sourcefile)
-        evalutor.evaluate(optimize=optimize_ir_code, llvmdump=show_llvm_result)
+        if cached is None and use_cache:
+            cache.save(tree, symbol_table, evalutor.ir_code, evalutor.func_name)
     except (ParserError, TokenizeError, SemanticError) as err:
         print(err.message)
         sys.exit(1)
@@ -19,23 +19,26 @@
 #                                                                                         #
 # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
 
+import operator
+from typing import Dict, Optional, Union
+
 from llvmlite.ir import (
     Constant,
     Instruction,
     Module,
     IRBuilder,
-    VoidType,
     IntType,
     DoubleType,
     FunctionType,
     ArrayType,
     GlobalVariable,
     Function,
+    PointerType,
 )
 
 from token_type import TokenType
 from visitor import NodeVisitor
-from symbols import VarSymbol
+from semantic_handler import SemanticHandler
 from AST import (
     Program,
     Block,
@@ -46,16 +49,124 @@ from AST import (
     Writeln,
     BinaryOperator,
     VarDeclaration,
-    Type,
     Num,
     String,
     Boolean,
-    Empty,
 )
 
+# Enum members are singletons, so the operators are compared by identity
+_PLUS = TokenType.PLUS
+_MINUS = TokenType.MINUS
+_MUL = TokenType.MUL
+_INTEGER_DIV = TokenType.INTEGER_DIV
+_FLOAT_DIV = TokenType.FLOAT_DIV
+
+# The LLVM types are immutable, so each one is created once and shared
+_DOUBLE = DoubleType()
+_BOOL = IntType(1)
+_I8 = IntType(8)
+_INT32 = IntType(32)
+_I8_POINTER = _I8.as_pointer()
+_I8_ARRAY_TYPES: Dict[int, ArrayType] = {}
+
+# Constant (i1) of each boolean literal
+_BOOLEAN_CONSTANTS = {
+    TokenType.TRUE: Constant(_BOOL, 1),
+    TokenType.FALSE: Constant(_BOOL, 0),
+}
+
+# LLVM type of the memory of the variables of each declared type
+_VARIABLE_TYPES = {
+    TokenType.INTEGER: _DOUBLE,
+    TokenType.REAL: _DOUBLE,
+    TokenType.STRING: _I8_POINTER,
+    TokenType.BOOLEAN: _BOOL,
+}
+
+
+def _i8_array_type(length: int) -> ArrayType:
+    """Returns the type of an array of characters (i8), created once per length.
+
+    Args:
+        length (int): number of characters
+
+    Returns:
+        ArrayType: the [length x i8] type
+    """
+
+    array_type = _I8_ARRAY_TYPES.get(length)
+    if array_type is None:
+        array_type = _I8_ARRAY_TYPES[length] = ArrayType(_I8, length)
+
+    return array_type
+
+
+# printf formats of the numbers and of the other values (strings and booleans)
+_FLOAT_FORMAT = b"%f\n"
+_STRING_FORMAT = b"%s\n"
+
+
+# Fast-math flags of the arithmetic instructions: LLVM may reassociate, contract
+# (fuse) and vectorize them. The flags that turn NaN and infinity into poison values
+# (nnan, ninf) are left out, so a division by zero still prints inf.
+_FAST_MATH_FLAGS = ("reassoc", "contract", "nsz", "arcp")
+
+# Operators whose right operand is an identity element when it is 1
+_ONE_IDENTITY_OPERATORS = frozenset({_MUL, _INTEGER_DIV, _FLOAT_DIV})
+
+# Python operations used to fold constants, both divisions being floating point
+# divisions as in the generated instructions
+_FOLD_OPERATIONS = {
+    _PLUS: operator.add,
+    _MINUS: operator.sub,
+    _MUL: operator.mul,
+    _INTEGER_DIV: operator.truediv,
+    _FLOAT_DIV: operator.truediv,
+}
+
+
+def _fold_binary_operation(
+    operator_type: TokenType, left: float, right: float
+) -> Optional[float]:
+    """Computes a binary operation between two constants the way the generated
+    instructions would.
+
+    Args:
+        operator_type (TokenType): the arithmetic operator
+        left (float): value of the left operand
+        right (float): value of the right operand
+
+    Returns:
+        Optional[float]: the result, None when the operation is left to LLVM (division
+        by zero)
+    """
+
+    if right == 0.0 and operator_type in _ONE_IDENTITY_OPERATORS:
+        return None
+
+    return _FOLD_OPERATIONS[operator_type](left, right)
+
 
 class CodeGenerator(NodeVisitor):
-    def __init__(self, symbol_table) -> None:
+    """Transforms the AST into LLVM IR. The semantic checks of each node are run by
+    the Semantic Handler as the node is visited, so the tree is validated and
+    transformed in a single walk.
+
+    Args:
+        semantic_handler (SemanticHandler): handler that owns the Symbol Table and
+        performs the semantic checks
+    """
+
+    # Builder method and result name of the instruction of each arithmetic operator
+    _BINARY_INSTRUCTIONS = {
+        _PLUS: (IRBuilder.fadd, "addtmp"),
+        _MINUS: (IRBuilder.fsub, "subtmp"),
+        _MUL: (IRBuilder.fmul, "multmp"),
+        _INTEGER_DIV: (IRBuilder.fdiv, "udivtmp"),
+        _FLOAT_DIV: (IRBuilder.fdiv, "fdivtmp"),
+    }
+
+    def __init__(self, semantic_handler: SemanticHandler) -> None:
         # Module is an LLVM construct that contains functions and global variables.
         # In many ways, it is the top-level structure that the LLVM IR uses to contain
         # code. It will own the memory for all of the IR that we generate, which is why
@@ -65,49 +176,41 @@ class CodeGenerator(NodeVisitor):
         # The Builder object is a helper object that makes it easy to generate LLVM
         # instructions. Instances of the IRBuilder class template keep track of the
         # current place to insert instructions and has methods to create new instructions.
-        self.builder = None
-        self.symbol_table = symbol_table
-        self.expr_counter = 0
-        self.str_counter = 0
-        self.bool_counter = 0
-        self.printf_counter = 0
+        self.builder = IRBuilder()
+        self.semantic_handler = semantic_handler
+        self.symbol_table = semantic_handler.symbol_table
         self.func_name = ""
-        self.GLOBAL_MEMORY = {}
+        # Memory (alloca) of each variable, by name
+        self.GLOBAL_MEMORY: Dict[str, Instruction] = {}
 
-    def _create_instruct(self, typ: str, is_printf: bool = False) -> None:
-        """Create a new Function instruction and attach it to a new Basic Block Entry.
+        # Constant of each number literal, shared by the nodes with the same value
+        self.num_constants: Dict[float, Constant] = {}
 
-        Args:
-            typ (str): node type.
-            is_printf (bool, optional): Defaults to False.
-        """
-
-        if is_printf or typ in ["String", "ArrayType"]:
-            self.str_counter += 1
-            self.func_name = f"_{typ}.{self.str_counter}"
-            func_type = FunctionType(VoidType(), [])
-        elif typ == "Boolean":
-            self.bool_counter += 1
-            self.func_name = f"_{typ}.{self.bool_counter}"
-            func_type = FunctionType(IntType(1), [])
-        else:
-            self.expr_counter += 1
-            self.func_name = f"_{typ}_Expr.{self.expr_counter}"
-            func_type = FunctionType(DoubleType(), [])
-
-        main_func = Function(self.module, func_type, self.func_name)
-        bb_entry = main_func.append_basic_block("entry")
-        self.builder = IRBuilder(bb_entry)
+        # printf is declared once and every writeln calls it
+        printf_type = FunctionType(_INT32, [_I8_POINTER], var_arg=True)
+        self.printf = Function(self.module, printf_type, "printf")
+        # Pointers (i8*) to the global constants holding the strings and the printf
+        # formats, one per distinct content
+        self.string_globals: Dict[bytes, Constant] = {}
+        super().__init__()
 
     def visit_Program(self, node: Program) -> None:
-        """Visit the Block node in AST and call it.
+        """Creates the main function, with a single Basic Block Entry, and generates
+        the whole program into it, so LLVM optimizes all the statements together.
 
         Args:
             node (Program): Program node (root)
         """
 
+        self.func_name = "main"
+        main_func = Function(self.module, FunctionType(_DOUBLE, []), self.func_name)
+        bb_entry = main_func.append_basic_block("entry")
+        self.builder.position_at_end(bb_entry)
+
         self.visit(node.block)
 
+        self.builder.ret(Constant(_DOUBLE, 0.0))
+
     def visit_Block(self, node: Block) -> None:
         """Initializes the method calls according to the nodes represented by the
         variables and compound declarations.
@@ -116,9 +219,10 @@ class CodeGenerator(NodeVisitor):
             node (Block): the block containing the VAR and BEGIN sections
         """
 
+        visit_declaration = self.visit_VarDeclaration
         for declaration in node.declarations:
-            self.visit(declaration)
-        self.visit(node.compound_statement)
+            visit_declaration(declaration)
+        self.visit_Compound(node.compound_statement)
 
     def visit_Compound(self, node: Compound) -> None:
         """Central component that coordinates the compound statements (assigments and
@@ -129,48 +233,51 @@ class CodeGenerator(NodeVisitor):
             and writeln statement)
         """
 
+        # The children are only Compound, Assign and Writeln nodes (the parser drops
+        # the empty statements), so each one is dispatched straight from the table
+        dispatch = self._dispatch
         for child in node.children:
-            self.visit(child)
+            dispatch[type(child)](child)
 
     def visit_Assign(self, node: Assign) -> None:
         """Creates the LLVM IR instructions for the expressions, strings or Booleans
-        that are assigned to a variable and adds these to a **auxiliary** GLOBAL MEMORY.
+        that are assigned to a variable and stores the result in the memory of the
+        variable (GLOBAL MEMORY).
 
         Args:
             node (Assign): node containing the assignment content
         """
 
-        node_type = type(node.right).__name__
-        if isinstance(node.right, String):
-            self._create_instruct(node_type)
-            self.visit(node.left)
-            instruct = self.visit(node.right)
-            c_str = self.builder.alloca(instruct.type)
-            self.builder.store(instruct, c_str)
-            self.builder.ret_void()
-        else:
-            self._create_instruct(node_type)
-            self.visit(node.left)
-            instruct = self.visit(node.right)
-            self.builder.ret(instruct)
+        self.semantic_handler.check_Var(node.left)
+        instruct = self.visit(node.right)
+
+        # Strings are kept in the variables as a pointer to their characters
+        if isinstance(instruct.type, ArrayType):
+            instruct = self._string_pointer(bytes(instruct.constant))
 
-        self.GLOBAL_MEMORY[node.left.value] = instruct
+        var_name = node.left.value
+        var_pointer = self.GLOBAL_MEMORY.get(var_name)
+        if var_pointer is None or var_pointer.type.pointee != instruct.type:
+            # The value does not have the declared type of the variable
+            var_pointer = self.builder.alloca(instruct.type, name=var_name)
+            self.GLOBAL_MEMORY[var_name] = var_pointer
 
-    def visit_Var(self, node: Var) -> VarSymbol:
-        """Search for the variable in the Symbol Table and define the Double Type.
+        self.builder.store(instruct, var_pointer)
+        self.semantic_handler.check_Assign(node)
+
+    def visit_Var(self, node: Var) -> Instruction:
+        """Loads the value of a variable from its memory.
 
         Args:
             node (Var): variable token
 
         Returns:
-            VarSymbol: a variable symbol with updated type
+            Instruction: the value of the variable
         """
 
-        var_name = node.value
-        var_symbol = self.symbol_table.get_token(var_name)
-        var_symbol.type = DoubleType()
+        self.semantic_handler.check_Var(node)
 
-        return var_symbol
+        return self.builder.load(self.GLOBAL_MEMORY[node.value], node.value)
 
     def visit_Num(self, node: Num) -> Constant:
         """Set the Double Type to a specific number.
@@ -181,7 +288,13 @@ class CodeGenerator(NodeVisitor):
         Returns:
             Constant: a LLVM IR Constant representing the number.
         """
-        return Constant(DoubleType(), float(node.value))
+
+        value = float(node.value)
+        constant = self.num_constants.get(value)
+        if constant is None:
+            constant = self.num_constants[value] = Constant(_DOUBLE, value)
+
+        return constant
 
     def visit_BinaryOperator(self, node: BinaryOperator) -> Instruction:
         """Performs the Binary arithmetic operations and returns a LLVM IR Instruction
@@ -195,49 +308,68 @@ class CodeGenerator(NodeVisitor):
             Instruction: LLVM arithmetic instruction
         """
 
-        left = self.visit(node.left)
-        right = self.visit(node.right)
-
-        if isinstance(left, VarSymbol):
-            left_symbol = self.GLOBAL_MEMORY[left.name]
-        else:
-            left_symbol = left
+        # The operands are always expression nodes, which all have a visitor, so they
+        # are dispatched straight from the table
+        dispatch = self._dispatch
+        left, right = node.left, node.right
+        left_symbol = dispatch[type(left)](left)
+        right_symbol = dispatch[type(right)](right)
+        self.semantic_handler.check_BinaryOperator(node)
+
+        operator_type = node.token.type
+
+        # Operations between constants are folded here instead of being emitted for
+        # LLVM to fold them
+        if isinstance(left_symbol, Constant) and isinstance(right_symbol, Constant):
+            folded = _fold_binary_operation(
+                operator_type, left_symbol.constant, right_symbol.constant
+            )
+            if folded is not None:
+                return Constant(_DOUBLE, folded)
+
+        # Operations with the identity element give back the other operand
+        if isinstance(right_symbol, Constant):
+            right_value = right_symbol.constant
+            if (right_value == 0.0 and operator_type is _MINUS) or (
+                right_value == 1.0 and operator_type in _ONE_IDENTITY_OPERATORS
+            ):
+                return left_symbol
+        if (
+            isinstance(left_symbol, Constant)
+            and left_symbol.constant == 1.0
+            and operator_type is _MUL
+        ):
+            return right_symbol
+
+        instruction, name = self._BINARY_INSTRUCTIONS[operator_type]
+        return instruction(
+            self.builder, left_symbol, right_symbol, name, _FAST_MATH_FLAGS
+        )
 
-        if isinstance(right, VarSymbol):
-            right_symbol = self.GLOBAL_MEMORY[right.name]
-        else:
-            right_symbol = right
-
-        if node.operator.type == TokenType.PLUS:
-            return self.builder.fadd(left_symbol, right_symbol, "addtmp")
-        elif node.operator.type == TokenType.MINUS:
-            return self.builder.fsub(left_symbol, right_symbol, "subtmp")
-        elif node.operator.type == TokenType.MUL:
-            return self.builder.fmul(left_symbol, right_symbol, "multmp")
-        elif node.operator.type == TokenType.INTEGER_DIV:
-            return self.builder.fdiv(left_symbol, right_symbol, "udivtmp")
-        elif node.operator.type == TokenType.FLOAT_DIV:
-            return self.builder.fdiv(left_symbol, right_symbol, "fdivtmp")
-
-    def visit_UnaryOperator(self, node: UnaryOperator) -> Constant:
+    def visit_UnaryOperator(self, node: UnaryOperator) -> Union[Constant, Instruction]:
         """Performs Unary Operations according to the arithmetic operator (PLUS and MINUS)
-        transforming them into a LLVM IR Constant.
+        transforming them into a LLVM IR Constant, or a negation instruction when the
+        operand is not a constant.
 
         Args:
             node (UnaryOperator): node containing the variables (or numbers) and the
             arithmetic operators (PLUS and MINUS)
 
         Returns:
-            Constant: a LLVM IR Constant representing the number or variable.
+            Union[Constant, Instruction]: the LLVM IR value representing the number or
+            variable.
         """
 
-        operator = node.operator.type
-        if operator == TokenType.PLUS:
-            expression = self.visit(node.expression)
-            return Constant(DoubleType(), float(+expression.constant))
-        elif operator == TokenType.MINUS:
-            expression = self.visit(node.expression)
-            return Constant(DoubleType(), float(-expression.constant))
+        expression = self._dispatch[type(node.expression)](node.expression)
+        self.semantic_handler.check_UnaryOperator(node)
+
+        operator = node.token.type
+        if operator is _PLUS:
+            return expression
+        elif operator is _MINUS:
+            if isinstance(expression, Constant):
+                return Constant(_DOUBLE, -float(expression.constant))
+            return self.builder.fneg(expression, "negtmp", _FAST_MATH_FLAGS)
 
     def visit_String(self, node: String) -> Constant:
         """Converts the literal string to an array of characters.
@@ -249,10 +381,8 @@ class CodeGenerator(NodeVisitor):
             Constant: a constant containing a array of characters
         """
 
-        content = node.value
-        return Constant(
-            ArrayType(IntType(8), len(content)), bytearray(content.encode("utf8"))
-        )
+        content = bytearray(node.value.encode("utf8"))
+        return Constant(_i8_array_type(len(content)), content)
 
     def visit_Boolean(self, node: Boolean) -> Constant:
         """Converts the boolean type to an integer (i1) constant.
@@ -265,10 +395,7 @@ class CodeGenerator(NodeVisitor):
                 1 = True and 0 = False
         """
 
-        if node.token.type == TokenType.FALSE:
-            return Constant(IntType(1), 0)
-        else:
-            return Constant(IntType(1), 1)
+        return _BOOLEAN_CONSTANTS[node.token.type]
 
     def visit_Writeln(self, node: Writeln) -> None:
         """Converts the contents of the command writeln to LLVM ir code and adds the
@@ -278,61 +405,87 @@ class CodeGenerator(NodeVisitor):
             node (Writeln): content passed in the command writeln
         """
 
-        self.printf_counter += 1
-        output_operation_type = "%s"
+        self.semantic_handler.check_Writeln(node)
 
-        if isinstance(node.content[0], BinaryOperator):
-            self._create_instruct("BinaryOperator", is_printf=True)
+        content = self.visit(node.content[0])
 
-        writeln_content = self.visit(node.content[0])
+        # Numbers are printed as floats, and the other values (strings and booleans)
+        # with %s
+        content_type = type(content.type)
+        if content_type is DoubleType:
+            printf_format = _FLOAT_FORMAT
+        else:
+            printf_format = _STRING_FORMAT
 
-        if isinstance(writeln_content, VarSymbol):
-            content = self.GLOBAL_MEMORY[writeln_content.name]
+        fstr = self._string_pointer(printf_format, "fstr")
+
+        # Numbers are passed by value, strings as a pointer to their characters and
+        # booleans as a pointer to the "TRUE" or "FALSE" string
+        if content_type is DoubleType or content_type is PointerType:
+            printf_arg = content
+        elif content_type is ArrayType:
+            printf_arg = self._string_pointer(bytes(content.constant))
         else:
-            content = writeln_content
+            printf_arg = self.builder.select(
+                content,
+                self._string_pointer(b"TRUE"),
+                self._string_pointer(b"FALSE"),
+            )
 
-        content_type = type(content.type).__name__
+        self.builder.call(self.printf, [fstr, printf_arg])
 
-        if self.builder.block.is_terminated:
-            self._create_instruct(typ=content_type, is_printf=True)
+    def _string_pointer(self, content: bytes, name: str = "str") -> Constant:
+        """Stores the characters of a string, null terminated, in a global constant
+        of the module. Strings with the same content share the same global constant.
 
-        if isinstance(content.type, DoubleType):
-            output_operation_type = "%f"
+        Args:
+            content (bytes): characters of the string
+            name (str, optional): prefix of the name of the global constant. Defaults
+            to "str".
 
-        output_format = f"{output_operation_type}\n\0"
-        printf_format = Constant(
-            ArrayType(IntType(8), len(output_format)),
-            bytearray(output_format.encode("utf8")),
-        )
+        Returns:
+            Constant: pointer (i8*) to the first character of the string
+        """
 
-        fstr = GlobalVariable(
-            self.module, printf_format.type, name=f"fstr_{self.printf_counter}"
-        )
-        fstr.linkage = "internal"
-        fstr.global_constant = True
-        fstr.initializer = printf_format
-
-        writeln_type = FunctionType(IntType(32), [], var_arg=True)
-        writeln = Function(
-            self.module,
-            writeln_type,
-            name=f"printf_{content_type}_{self.printf_counter}",
-        )
+        string_pointer = self.string_globals.get(content)
+        if string_pointer is None:
+            characters = bytearray(content + b"\0")
+            string_value = Constant(_i8_array_type(len(characters)), characters)
 
-        body = self.builder.alloca(content.type)
-        temp_loaded = self.builder.load(body)
-        self.builder.store(temp_loaded, body)
+            string_global = GlobalVariable(
+                self.module, string_value.type, name=self.module.get_unique_name(name)
+            )
+            string_global.linkage = "internal"
+            string_global.global_constant = True
+            string_global.initializer = string_value
 
-        void_pointer_type = IntType(8).as_pointer()
-        casted_arg = self.builder.bitcast(fstr, void_pointer_type)
-        self.builder.call(writeln, [casted_arg, body])
-        self.builder.ret_void()
+            string_pointer = string_global.bitcast(_I8_POINTER)
+            self.string_globals[content] = string_pointer
+
+        return string_pointer
 
     def visit_VarDeclaration(self, node: VarDeclaration) -> None:
-        pass
+        """Adds the declared variable in the Symbol Table and allocates its memory in
+        the entry block of the main function, initialized to the zero value of its
+        type.
+
+        Args:
+            node (VarDeclaration): node containing the variable type and the var_node
+            represeting the variable
+        """
 
-    def visit_Type(self, node: Type) -> None:
-        pass
+        self.semantic_handler.check_VarDeclaration(node)
+
+        var_name = node.var_node.value
+        var_type = _VARIABLE_TYPES[node.type_node.token.type]
+        var_pointer = self.builder.alloca(var_type, name=var_name)
+
+        # A variable read before it is assigned holds the zero value of its type (0,
+        # FALSE or an empty string) instead of undefined memory
+        if var_type is _I8_POINTER:
+            zero_value = self._string_pointer(b"")
+        else:
+            zero_value = Constant(var_type, 0)
+        self.builder.store(zero_value, var_pointer)
 
-    def visit_Empty(self, node: Empty) -> None:
-        pass
+        self.GLOBAL_MEMORY[var_name] = var_pointer
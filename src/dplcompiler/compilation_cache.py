@@ -0,0 +1,158 @@
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#                                  Compilation Cache                                      #
+#                                                                                         #
+# Stores the results of a successful compilation (AST, Symbol Table and unoptimized LLVM  #
+# IR) keyed by the SHA-256 hash of the source code and of the compiler's own modules.     #
+# When the same source is compiled again, the Tokenizer, Parser, Semantic Handler and     #
+# Code Generator are skipped and the stored IR goes straight to the JIT. Any change in    #
+# the source or in the compiler changes the hash, so an outdated entry is never used.     #
+#                                                                                         #
+# # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+import os
+import pickle
+import hashlib
+from typing import Optional, Tuple
+
+import llvmlite
+
+from AST import Program
+from symbols import SymbolTable
+
+
+class CompilationCache:
+    """Compilation results of a source code.
+
+    Args:
+        source_code (bytes): the source code that will be compiled, as read from the
+            source file
+        cache_dir (Optional[str], optional): directory of the cached files.
+            Defaults to ~/.cache/dplcompiler.
+    """
+
+    CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "dplcompiler")
+    # The modules of the compiler are part of the key of the entries, so the entries
+    # of any other version of the compiler are never loaded
+    COMPILER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+    def __init__(self, source_code: bytes, cache_dir: Optional[str] = None) -> None:
+        source_hash = hashlib.sha256(self._hash_compiler())
+        source_hash.update(source_code)
+        self.source_hash = source_hash.hexdigest()
+        self.cache_dir = cache_dir or self.CACHE_DIR
+        self._base_path = os.path.join(self.cache_dir, self.source_hash)
+
+    def _hash_compiler(self) -> bytes:
+        """Hashes the sources of the compiler modules and the version of llvmlite,
+        which generates the text of the IR.
+
+        Returns:
+            bytes: SHA-256 digest of the compiler
+        """
+
+        compiler_hash = hashlib.sha256(f"{llvmlite.__version__}\n".encode("utf-8"))
+
+        module_paths = []
+        for dir_path, dir_names, file_names in os.walk(self.COMPILER_DIR):
+            dir_names[:] = [name for name in dir_names if name != "__pycache__"]
+            module_paths.extend(
+                os.path.join(dir_path, name)
+                for name in file_names
+                if name.endswith(".py")
+            )
+
+        # The modules are hashed in a fixed order, each one with its relative path
+        for module_path in sorted(module_paths):
+            with open(module_path, "rb") as module:
+                module_source = module.read()
+            relative_path = os.path.relpath(module_path, self.COMPILER_DIR)
+            compiler_hash.update(
+                f"{relative_path}\0{len(module_source)}\0".encode("utf-8")
+            )
+            compiler_hash.update(module_source)
+
+        return compiler_hash.digest()
+
+    @staticmethod
+    def is_private(cache_dir: str) -> bool:
+        """Checks that only its owner can write to a cache directory. A missing
+        directory is created private when the first entry is saved.
+
+        Args:
+            cache_dir (str): the cache directory
+
+        Returns:
+            bool: False if the group or the other users can write to the directory, or
+            if it cannot be used (e.g. a path under a regular file)
+        """
+
+        try:
+            return not os.stat(cache_dir).st_mode & 0o022
+        except FileNotFoundError:
+            return True
+        except OSError:
+            return False
+
+    def load(self) -> Optional[Tuple[Program, SymbolTable, str, str]]:
+        """Loads the compilation results of the source code, if they were stored.
+
+        Returns:
+            Optional[Tuple[Program, SymbolTable, str, str]]: the tree, the symbol
+            table, the unoptimized LLVM IR and the name of the JIT entry function
+        """
+
+        try:
+            # The entries are unpickled, so they are only trusted in a directory that
+            # nobody else can write to
+            if not self.is_private(self.cache_dir):
+                return None
+
+            with open(f"{self._base_path}.pkl", "rb") as cached:
+                tree, symbol_table, func_name = pickle.load(cached)
+
+            with open(f"{self._base_path}.ll", "r") as cached:
+                ir_code = cached.read()
+        except (OSError, EOFError, AttributeError, pickle.PickleError):
+            # Missing or written by an incompatible version of the compiler
+            return None
+
+        return tree, symbol_table, ir_code, func_name
+
+    def save(
+        self, tree: Program, symbol_table: SymbolTable, ir_code: str, func_name: str
+    ) -> None:
+        """Stores the compilation results of the source code.
+
+        Args:
+            tree (Program): the tree already semantically validated
+            symbol_table (SymbolTable): the symbol table of the program
+            ir_code (str): the unoptimized LLVM IR
+            func_name (str): name of the function called by the JIT
+        """
+
+        try:
+            os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+            self._write(f"{self._base_path}.ll", ir_code.encode("utf-8"))
+            # The pickle is written last: it marks the entry as complete
+            self._write(
+                f"{self._base_path}.pkl",
+                pickle.dumps((tree, symbol_table, func_name)),
+            )
+        except OSError:
+            # The cache is only an optimization, the program was already compiled
+            pass
+
+    @staticmethod
+    def _write(path: str, content: bytes) -> None:
+        """Writes a cached file to a temporary file and only then renames it, so a
+        partial file is never loaded.
+
+        Args:
+            path (str): path of the cached file
+            content (bytes): content of the file
+        """
+
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as cached:
+            cached.write(content)
+        os.replace(temp_path, path)
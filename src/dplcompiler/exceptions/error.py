@@ -16,6 +16,12 @@ class Error(Exception):
         self.error_code = error_code
         self.token = token
         self.message = f"{self.__class__.__name__}: {message}"
+        super().__init__(message)
+
+    def __reduce__(self):
+        # The error is rebuilt from the arguments of __init__ when it is pickled or
+        # copied, instead of from args
+        return self.__class__, (self.error_code, self.token, self.args[0])
 
 
 class TokenizeError(Error):
@@ -14,11 +14,13 @@
 # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
 
 
-from typing import Union, Optional
+import operator
+from typing import Dict, Union, Optional, final
 
 from visitor import NodeVisitor
 from token_type import TokenType
 from AST import (
+    AST,
     Program,
     Block,
     Compound,
@@ -27,15 +29,16 @@ from AST import (
     Writeln,
     BinaryOperator,
     UnaryOperator,
-    VarDeclaration,
-    Type,
     Num,
     String,
     Boolean,
-    Empty,
 )
 
+# Literal nodes, whose value never changes
+_LITERALS = frozenset({Num, String, Boolean})
 
+
+@final
 class Handler(NodeVisitor):
     """Abstract-Syntax Tree (AST) already processed.
 
@@ -44,9 +47,40 @@ class Handler(NodeVisitor):
         nodes of the branch
     """
 
+    _BINARY_OPERATIONS = {
+        TokenType.PLUS: operator.add,
+        TokenType.MINUS: operator.sub,
+        TokenType.MUL: operator.mul,
+        TokenType.INTEGER_DIV: operator.floordiv,
+        TokenType.FLOAT_DIV: operator.truediv,
+    }
+
+    _UNARY_OPERATIONS = {
+        TokenType.PLUS: operator.pos,
+        TokenType.MINUS: operator.neg,
+    }
+
     def __init__(self, tree: Program) -> None:
         self.tree = tree
         self.GLOBAL_MEMORY = {}
+        # Results of the operations made only of literals, which always give the same
+        # result, keyed by the id of their node. The tree is kept alive by the handler,
+        # so the ids are not reused.
+        self._constant_results: Dict[int, Union[int, float]] = {}
+        super().__init__()
+
+    def _is_constant(self, node: AST) -> bool:
+        """Checks if a node is a literal or an operation made only of literals, whose
+        result was already stored.
+
+        Args:
+            node (AST): an already visited operand
+
+        Returns:
+            bool: True if the value of the node never changes
+        """
+
+        return type(node) in _LITERALS or id(node) in self._constant_results
 
     def visit_Program(self, node: Program) -> None:
         """Visit the Block node in AST and call it.
@@ -59,21 +93,14 @@ class Handler(NodeVisitor):
 
     def visit_Block(self, node: Block) -> None:
         """Initializes the method calls according to the nodes represented by the
-        variables and compound declarations.
+        compound declarations. The variable declarations were already checked by the
+        Semantic Handler and do nothing when the program runs.
 
         Args:
             node (Block): the block containing the VAR and BEGIN sections
         """
 
-        for declaration in node.declarations:
-            self.visit(declaration)
-        self.visit(node.compound_statement)
-
-    def visit_VarDeclaration(self, node: VarDeclaration) -> None:
-        pass
-
-    def visit_Type(self, node: Type) -> None:
-        pass
+        self.visit_Compound(node.compound_statement)
 
     def visit_BinaryOperator(self, node: BinaryOperator) -> Union[int, float, None]:
         """Performs Binary Operations according to the arithmetic operator.
@@ -86,18 +113,24 @@ class Handler(NodeVisitor):
             Union[int, float, None]: result of the arithmetic operation
         """
 
-        if node.operator.type == TokenType.PLUS:
-            return self.visit(node.left) + self.visit(node.right)
-        elif node.operator.type == TokenType.MINUS:
-            return self.visit(node.left) - self.visit(node.right)
-        elif node.operator.type == TokenType.MUL:
-            return self.visit(node.left) * self.visit(node.right)
-        elif node.operator.type == TokenType.INTEGER_DIV:
-            return self.visit(node.left) // self.visit(node.right)
-        elif node.operator.type == TokenType.FLOAT_DIV:
-            return float(self.visit(node.left)) / float(self.visit(node.right))
+        # Operations made only of literals always give the same result
+        constant_results = self._constant_results
+        node_id = id(node)
+        if node_id in constant_results:
+            return constant_results[node_id]
+
+        operation = self._BINARY_OPERATIONS.get(node.token.type)
+        if operation is None:
+            return None
+
+        visit = self.visit
+        left, right = node.left, node.right
+        result = operation(visit(left), visit(right))
+
+        if self._is_constant(left) and self._is_constant(right):
+            constant_results[node_id] = result
 
-        return None
+        return result
 
     def visit_UnaryOperator(self, node: UnaryOperator) -> Optional[int]:
         """Performs Unary Operations according to the arithmetic operator (PLUS and MINUS).
@@ -110,13 +143,22 @@ class Handler(NodeVisitor):
             Optional[int]: result of the arithmetic operation
         """
 
-        operator = node.operator.type
-        if operator == TokenType.PLUS:
-            return +self.visit(node.expression)
-        elif operator == TokenType.MINUS:
-            return -self.visit(node.expression)
+        constant_results = self._constant_results
+        node_id = id(node)
+        if node_id in constant_results:
+            return constant_results[node_id]
 
-        return None
+        operation = self._UNARY_OPERATIONS.get(node.token.type)
+        if operation is None:
+            return None
+
+        expression = node.expression
+        result = operation(self.visit(expression))
+
+        if self._is_constant(expression):
+            constant_results[node_id] = result
+
+        return result
 
     def visit_Num(self, node: Num) -> int:
         """Returns a number (contant) of the a tree node.
@@ -163,8 +205,17 @@ class Handler(NodeVisitor):
             and writeln statement)
         """
 
-        for child in node.children:
-            self.visit(child)
+        # Nested BEGIN ... END blocks are flattened on an explicit stack instead of
+        # recursing through visit_Compound
+        dispatch = self._dispatch
+        stack = list(reversed(node.children))
+        pop, extend = stack.pop, stack.extend
+        while stack:
+            child = pop()
+            if type(child) is Compound:
+                extend(reversed(child.children))
+            else:
+                dispatch[type(child)](child)
 
     def visit_Assign(self, node: Assign) -> None:
         """allocates in a dictionary the content of an assignment (value) according to
@@ -204,9 +255,6 @@ class Handler(NodeVisitor):
 
         print(self.visit(node.content[0]))
 
-    def visit_Empty(self, node: Empty) -> None:
-        pass
-
     def handle(self) -> Union[str, int]:
         """Starts scanning the tree nodes.
 
@@ -15,10 +15,14 @@
 #                                                                                         #
 # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
 
-from typing import List, Union
+from itertools import chain, repeat
+from typing import Callable, Dict, List, Union
 
+from token import Token
 from token_type import TokenType
+from tokenizer import Tokenizer
 from AST import (
+    AST,
     Assign,
     BinaryOperator,
     Block,
@@ -40,10 +44,55 @@ from exceptions import ErrorCode
 
 
 class Parser:
-    def __init__(self, tokenizer) -> None:
+    # Precedence of the binary operators, the terms bind tighter than the expressions
+    _OPERATOR_PRECEDENCE = {
+        TokenType.PLUS: 1,
+        TokenType.MINUS: 1,
+        TokenType.MUL: 2,
+        TokenType.INTEGER_DIV: 2,
+        TokenType.FLOAT_DIV: 2,
+    }
+    # Types that can be declared
+    _TYPE_TOKENS = frozenset(
+        {TokenType.INTEGER, TokenType.REAL, TokenType.STRING, TokenType.BOOLEAN}
+    )
+    # Literals that can be mixed with an expression on the right of an assignment
+    _LITERAL_TOKENS = frozenset(
+        {TokenType.STRING_CONST, TokenType.FALSE, TokenType.TRUE}
+    )
+
+    def __init__(self, tokenizer: Tokenizer) -> None:
         self.tokenizer = tokenizer
+        # The source code is tokenized once up front and the tokens are then read from
+        # the list. After the end of the file the EOF token keeps being returned, as
+        # the tokenizer does.
+        tokens = self._tokenize(tokenizer)
+        # The rules that already checked the type of the current token move to the
+        # next one directly, without going through consume_token
+        self._next_token: Callable[[], Token] = chain(
+            tokens, repeat(tokens[-1])
+        ).__next__
         # set current token to the first token taken from the file
-        self.current_token = self.tokenizer.get_next_token()
+        self.current_token: Token = self._next_token()
+
+    @staticmethod
+    def _tokenize(tokenizer: Tokenizer) -> List[Token]:
+        """Reads all of the tokens of the source code.
+
+        Args:
+            tokenizer (Tokenizer): tokenizer of the source code
+
+        Returns:
+            List[Token]: the tokens, ending with the EOF token
+        """
+
+        get_next_token = tokenizer.get_next_token
+        tokens = [get_next_token()]
+        append = tokens.append
+        while tokens[-1].type is not TokenType.EOF:
+            append(get_next_token())
+
+        return tokens
 
     def consume_token(self, token_type: TokenType) -> None:
         """Compare the current token type with the token_type parameter and if they match
@@ -58,8 +107,8 @@ class Parser:
             ParserError: when the passed token is unknown
         """
 
-        if self.current_token.type == token_type:
-            self.current_token = self.tokenizer.get_next_token()
+        if self.current_token.type is token_type:
+            self.current_token = self._next_token()
         else:
             ParserErrorHandler.error(
                 error_code=ErrorCode.UNEXPECTED_TOKEN, token=self.current_token
@@ -115,41 +164,41 @@ class Parser:
             List[VarDeclaration]: List with all declaration of variables
         """
 
-        declarations = []
-        if self.current_token.type == TokenType.VAR:
+        declarations: List[VarDeclaration] = []
+        if self.current_token.type is TokenType.VAR:
             self.consume_token(TokenType.VAR)
-            while self.current_token.type == TokenType.ID:
-                var_declaration = self.variable_declaration()
-                declarations.extend(var_declaration)
+            while self.current_token.type is TokenType.ID:
+                self.variable_declaration(declarations)
                 self.consume_token(TokenType.SEMI)
 
         return declarations
 
-    def variable_declaration(self) -> List[VarDeclaration]:
-        """Assembles a list of all declaration of variables by TYPE_SPEC.
+    def variable_declaration(self, declarations: List[VarDeclaration]) -> None:
+        """Adds the declaration of each variable declared with the same TYPE_SPEC to the
+        list of declarations.
 
         Grammar: <variable> ::= ID (COMMA ID)* COLON <type_spec>
 
-        Returns:
-            List[VarDeclaration]: List with all declaration of variables by type
+        Args:
+            declarations (List[VarDeclaration]): list the declarations are added to
         """
 
-        var_nodes = [Var(self.current_token)]
+        # Only the tokens are collected while reading the names, the Var nodes are
+        # created together with their declarations once the type is known
+        var_tokens = [self.current_token]
         self.consume_token(TokenType.ID)
 
-        while self.current_token.type == TokenType.COMMA:
-            self.consume_token(TokenType.COMMA)
-            var_nodes.append(Var(self.current_token))
+        while self.current_token.type is TokenType.COMMA:
+            self.current_token = self._next_token()
+            var_tokens.append(self.current_token)
             self.consume_token(TokenType.ID)
 
         self.consume_token(TokenType.COLON)
 
         type_node = self.type_spec()
-        var_declarations = [
-            VarDeclaration(var_node, type_node) for var_node in var_nodes
-        ]
-
-        return var_declarations
+        declarations.extend(
+            VarDeclaration(Var(var_token), type_node) for var_token in var_tokens
+        )
 
     def type_spec(self) -> Type:
         """Assembles a Type object with the type of variable and the value.
@@ -162,14 +211,10 @@ class Parser:
         """
 
         token = self.current_token
-        if self.current_token.type == TokenType.INTEGER:
-            self.consume_token(TokenType.INTEGER)
-        elif self.current_token.type == TokenType.REAL:
-            self.consume_token(TokenType.REAL)
-        elif self.current_token.type == TokenType.STRING:
-            self.consume_token(TokenType.STRING)
+        if token.type in self._TYPE_TOKENS:
+            self.current_token = self._next_token()
         else:
-            self.consume_token(TokenType.BOOLEAN)
+            ParserErrorHandler.error(error_code=ErrorCode.UNEXPECTED_TOKEN, token=token)
 
         node = Type(token)
         return node
@@ -180,15 +225,14 @@ class Parser:
         Grammar: <compound_statement> ::= BEGIN <statement_list> END
 
         Returns:
-            Compound: an object with a list containing all of compound statements
+            Compound: an object with a tuple containing all of compound statements
         """
         self.consume_token(TokenType.BEGIN)
         nodes = self.statement_list()
         self.consume_token(TokenType.END)
 
-        root = Compound()
-        for node in nodes:
-            root.children.append(node)
+        # The statement list is frozen into the children of the node
+        root = Compound(nodes)
 
         return root
 
@@ -203,10 +247,15 @@ class Parser:
         """
         node = self.statement()
 
-        results = [node]
-        while self.current_token.type == TokenType.SEMI:
-            self.consume_token(TokenType.SEMI)
-            results.append(self.statement())
+        # Empty statements do nothing, so they are not kept in the tree
+        results = [] if type(node) is Empty else [node]
+        append = results.append
+        next_token = self._next_token
+        while self.current_token.type is TokenType.SEMI:
+            self.current_token = next_token()
+            node = self.statement()
+            if type(node) is not Empty:
+                append(node)
 
         return results
 
@@ -223,16 +272,12 @@ class Parser:
             compound or empty statement
         """
 
-        if self.current_token.type == TokenType.BEGIN:
-            node = self.compound_statement()
-        elif self.current_token.type == TokenType.WRITELN:
-            node = self.writeln_statement()
-        elif self.current_token.type == TokenType.ID:
-            node = self.assignment_statement()
-        else:
+        statement_parser = self._STATEMENT_PARSERS.get(self.current_token.type)
+        if statement_parser is None:
             node = self.empty()
+            return node
 
-        return node
+        return statement_parser(self)
 
     def writeln_statement(self) -> Writeln:
         """Assembles the 'writeln' command content.
@@ -247,12 +292,12 @@ class Parser:
             Union[Var, Num, String, Boolean, BinaryOperator, UnaryOperator, None]
         ] = []
         self.consume_token(TokenType.WRITELN)
-        while self.current_token.type != TokenType.SEMI:
-            if self.current_token.type == TokenType.STRING_CONST:
+        while self.current_token.type is not TokenType.SEMI:
+            if self.current_token.type is TokenType.STRING_CONST:
                 content.append(self.string_parser())
-            elif self.current_token.type == TokenType.TRUE:
+            elif self.current_token.type is TokenType.TRUE:
                 content.append(self.bool_true_parser())
-            elif self.current_token.type == TokenType.FALSE:
+            elif self.current_token.type is TokenType.FALSE:
                 content.append(self.bool_false_parser())
             else:
                 content.append(self.expression_parser())
@@ -276,12 +321,12 @@ class Parser:
         ] = []
         self.consume_token(TokenType.ASSIGN)
 
-        while self.current_token.type != TokenType.SEMI:
-            if self.current_token.type == TokenType.STRING_CONST:
+        while self.current_token.type is not TokenType.SEMI:
+            if self.current_token.type is TokenType.STRING_CONST:
                 right_expressions.append(self.string_parser())
-            elif self.current_token.type == TokenType.FALSE:
+            elif self.current_token.type is TokenType.FALSE:
                 right_expressions.append(self.bool_false_parser())
-            elif self.current_token.type == TokenType.TRUE:
+            elif self.current_token.type is TokenType.TRUE:
                 right_expressions.append(self.bool_true_parser())
             else:
                 right_expressions.append(self.expression_parser())
@@ -301,14 +346,8 @@ class Parser:
         for index, item in enumerate(right_expressions):
             next_item = right_expressions[index - 1]
 
-            if (
-                item.token.type
-                in [
-                    TokenType.STRING_CONST,
-                    TokenType.FALSE,
-                    TokenType.TRUE,
-                ]
-                and isinstance(next_item, (BinaryOperator, UnaryOperator))
+            if item.token.type in self._LITERAL_TOKENS and isinstance(
+                next_item, (BinaryOperator, UnaryOperator)
             ):
                 return BinaryOperator(
                     left=item, operator=next_item.operator, right=next_item
@@ -354,94 +393,79 @@ class Parser:
                 or an BinaryOperator expression ((x + 7) * y)
         """
 
-        token = self.current_token
-        if token.type == TokenType.PLUS:
-            self.consume_token(TokenType.PLUS)
-            node = UnaryOperator(token, self.factor())
-            return node
-        elif token.type == TokenType.MINUS:
-            self.consume_token(TokenType.MINUS)
-            node = UnaryOperator(token, self.factor())
-            return node
-        elif token.type == TokenType.INTEGER_CONST:
-            self.consume_token(TokenType.INTEGER_CONST)
-            return Num(token)
-        elif token.type == TokenType.REAL_CONST:
-            self.consume_token(TokenType.REAL_CONST)
-            return Num(token)
-        elif token.type == TokenType.LPAREN:
-            self.consume_token(TokenType.LPAREN)
-            node = self.expression_parser()
-            self.consume_token(TokenType.RPAREN)
-            return node
-        elif token.type == TokenType.TRUE:
-            self.consume_token(TokenType.TRUE)
-            return Boolean(token)
-        elif token.type == TokenType.FALSE:
-            self.consume_token(TokenType.FALSE)
-            return Boolean(token)
-        elif token.type == TokenType.STRING_CONST:
-            self.consume_token(TokenType.STRING_CONST)
-            return String(token)
-        else:
+        factor_parser = self._FACTOR_PARSERS.get(self.current_token.type)
+        if factor_parser is None:
             node = self.variable()
             return node
 
-    def term(
-        self,
-    ) -> Union[Var, Num, Boolean, String, BinaryOperator, UnaryOperator, None]:
-        """Perform the Binary operations between Multiplication, Integer and Float
-        Division tokens.
+        return factor_parser(self)
 
-        Grammar: <term> ::= <factor> ((MUL | INTEGER_DIV | FLOAT_DIV) <factor>)*
+    def unary_operator_parser(self) -> UnaryOperator:
+        """Unary operation parser (PLUS <factor> | MINUS <factor>).
 
         Returns:
-            Union[Num, BinaryOperator, UnaryOperator, Var, None]: a token with the binary
-            operation result
+            UnaryOperator: a node with the operator and the factor it is applied to
         """
 
-        node = self.factor()
-        while self.current_token.type in [
-            TokenType.MUL,
-            TokenType.INTEGER_DIV,
-            TokenType.FLOAT_DIV,
-        ]:
-            token = self.current_token
-            if token.type == TokenType.MUL:
-                self.consume_token(TokenType.MUL)
-            elif token.type == TokenType.INTEGER_DIV:
-                self.consume_token(TokenType.INTEGER_DIV)
-            elif token.type == TokenType.FLOAT_DIV:
-                self.consume_token(TokenType.FLOAT_DIV)
+        token = self.current_token
+        self.current_token = self._next_token()
+        node = UnaryOperator(token, self.factor())
+        return node
+
+    def number_parser(self) -> Num:
+        """Number parser (INTEGER_CONST | REAL_CONST).
+
+        Returns:
+            Num: a token node that represeting a number
+        """
+
+        token = self.current_token
+        self.current_token = self._next_token()
+        return Num(token)
+
+    def parenthesized_expression_parser(
+        self,
+    ) -> Union[Var, Boolean, String, Num, BinaryOperator, UnaryOperator, None]:
+        """Parser of an expression between parentheses (LPAREN <expression> RPAREN).
 
-            node = BinaryOperator(left=node, operator=token, right=self.factor())
+        Returns:
+            Union[Num, BinaryOperator, UnaryOperator, Var, None]: the expression
+        """
 
+        self.consume_token(TokenType.LPAREN)
+        node = self.expression_parser()
+        self.consume_token(TokenType.RPAREN)
         return node
 
     def expression_parser(
-        self,
+        self, min_precedence: int = 1
     ) -> Union[Var, Boolean, String, Num, BinaryOperator, UnaryOperator, None]:
-        """Arithmetic expression parser.
+        """Arithmetic expression parser. The terms and the expressions are parsed by the
+        same loop (precedence climbing), the operators that bind tighter than
+        min_precedence are read by the recursive call that parses the right operand.
 
         Grammar: <expression>   ::= <term> ((PLUS | MINUS) <term>)*
                  <term>         ::= <factor> ((MUL | DIV) <factor>)*
                  <factor>       ::= INTEGER | LPAREN <expression> RPAREN
 
+        Args:
+            min_precedence (int): lowest precedence of the operators read by this call
+
         Returns:
             Union[Num, BinaryOperator, UnaryOperator, Var, None]: a result assignment
             to a variable, this is can be a number, binary or unary operation or another
             variable
         """
 
-        node = self.term()
-        while self.current_token.type in [TokenType.PLUS, TokenType.MINUS]:
+        precedence_of = self._OPERATOR_PRECEDENCE.get
+        node = self.factor()
+        precedence = precedence_of(self.current_token.type, 0)
+        while precedence >= min_precedence:
             token = self.current_token
-            if token.type == TokenType.PLUS:
-                self.consume_token(TokenType.PLUS)
-            elif token.type == TokenType.MINUS:
-                self.consume_token(TokenType.MINUS)
-
-            node = BinaryOperator(left=node, operator=token, right=self.term())
+            self.current_token = self._next_token()
+            right = self.expression_parser(precedence + 1)
+            node = BinaryOperator(left=node, operator=token, right=right)
+            precedence = precedence_of(self.current_token.type, 0)
 
         return node
 
@@ -453,7 +477,7 @@ class Parser:
         """
 
         token = self.current_token
-        self.consume_token(TokenType.STRING_CONST)
+        self.current_token = self._next_token()
         node = String(token)
         return node
 
@@ -465,7 +489,7 @@ class Parser:
         """
 
         token = self.current_token
-        self.consume_token(TokenType.FALSE)
+        self.current_token = self._next_token()
         node = Boolean(token)
         return node
 
@@ -477,7 +501,7 @@ class Parser:
         """
 
         token = self.current_token
-        self.consume_token(TokenType.TRUE)
+        self.current_token = self._next_token()
         node = Boolean(token)
         return node
 
@@ -489,9 +513,30 @@ class Parser:
         """
         node = self.program()
 
-        if self.current_token.type != TokenType.EOF:
+        if self.current_token.type is not TokenType.EOF:
             ParserErrorHandler.error(
                 error_code=ErrorCode.UNEXPECTED_TOKEN, token=self.current_token
             )
 
         return node
+
+    # Parser of the statement starting with each token type, the other tokens start an
+    # empty statement
+    _STATEMENT_PARSERS: Dict[TokenType, Callable[["Parser"], AST]] = {
+        TokenType.BEGIN: compound_statement,
+        TokenType.WRITELN: writeln_statement,
+        TokenType.ID: assignment_statement,
+    }
+
+    # Parser of the factor starting with each token type, the other tokens start a
+    # variable
+    _FACTOR_PARSERS: Dict[TokenType, Callable[["Parser"], AST]] = {
+        TokenType.PLUS: unary_operator_parser,
+        TokenType.MINUS: unary_operator_parser,
+        TokenType.INTEGER_CONST: number_parser,
+        TokenType.REAL_CONST: number_parser,
+        TokenType.LPAREN: parenthesized_expression_parser,
+        TokenType.TRUE: bool_true_parser,
+        TokenType.FALSE: bool_false_parser,
+        TokenType.STRING_CONST: string_parser,
+    }
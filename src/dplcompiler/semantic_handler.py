@@ -1,8 +1,8 @@
 # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
 #                                   Semantic Handler                                      #
 #                                                                                         #
-# With the aid of the Visitor Pattern, the class in question visits each of the nodes in  #
-# the Abstract-Syntax Tree (AST) and when identifying a symbol that is not in the table,  #
+# The class in question checks each of the nodes of the Abstract-Syntax Tree (AST) as    #
+# the Code Generator visits them, and when identifying a symbol that is not in the table, #
 # it includes this one. Therefore, this class IS THE CENTRAL COMPONENT in the management  #
 # of the Symbol Table and all SEMANTIC CHECKS.                                            #
 #                                                                                         #
@@ -12,15 +12,14 @@
 #                                                                                         #
 # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
 
+from typing import Dict, Optional, Union
+
 from context import Context
 from symbols import SymbolTable, VarSymbol
 from token_type import TokenType
-from type_checker import TypeChecker
-from visitor import NodeVisitor
+from type_checker import allowed_types
 from AST import (
-    Program,
-    Block,
-    Compound,
+    AST,
     Assign,
     Var,
     Writeln,
@@ -30,241 +29,258 @@ from AST import (
     Num,
     String,
     Boolean,
-    Empty,
 )
 
 from exceptions import SemanticErrorHandler
 from exceptions import ErrorCode
 
+# Types accepted by the operations, resolved once instead of on every check
+_BIN_OP_TYPES = allowed_types(Context.BIN_OP)
+_UN_OP_TYPES = allowed_types(Context.UN_OP)
 
-class SemanticHandler(NodeVisitor):
-    def __init__(self):
-        self.symbol_table = SymbolTable()
-        self.type_checker = TypeChecker()
-        self.GLOBAL_MEMORY = {}
+# Operands that are checked by their symbol. The node classes are final, so they are
+# matched by their exact type instead of isinstance
+_LITERAL_OPERANDS = frozenset({Boolean, String})
+_SYMBOL_OPERANDS = frozenset({Var, Boolean, String})
+_OPERATIONS = frozenset({UnaryOperator, BinaryOperator})
 
-    def visit_Program(self, node: Program) -> None:
-        """Visit the Block node in AST and call it.
 
-        Args:
-            node (Program): Program node (root)
-        """
+class SemanticHandler:
+    """Semantic checks of the nodes of the tree. The Code Generator walks the tree and
+    calls the check of each node once its children were visited, so the tree is
+    validated and transformed in a single walk.
+    """
 
-        self.visit(node.block)
+    def __init__(self) -> None:
+        self.symbol_table: SymbolTable = SymbolTable()
+        # Type of the value last assigned to each variable
+        self.GLOBAL_MEMORY: Dict[str, TokenType] = {}
 
-    def visit_Block(self, node: Block) -> None:
-        """Visit the variable declaration section (VAR) and call the visit_VarDeclaration
-        method to identify and add the symbols and the Symbol Table. After this, call
-        visit_Compound method to handle with the compound statements (assigments).
-
-        Args:
-            node (Block): the block containing the VAR and BEGIN sections
-        """
-
-        for declaration in node.declarations:
-            self.visit(declaration)
-        self.visit(node.compound_statement)
-
-    def visit_VarDeclaration(self, node: VarDeclaration) -> None:
-        """Var declaration section (VAR), finds and adds symbols in the Symbol Table.
+    def check_VarDeclaration(self, node: VarDeclaration) -> None:
+        """Adds the declared variable in the Symbol Table, showing an error if it was
+        already declared.
 
         Args:
             node (VarDeclaration): node containing the variable type and the var_node
             represeting the variable
         """
 
-        type_name = node.type_node.value
-        type_symbol = self.symbol_table.get_token(type_name)
+        symbol_table = self.symbol_table
+        type_symbol = symbol_table.get_type_token(node.type_node.value)
         var_name = node.var_node.value
         var_symbol = VarSymbol(var_name, type_symbol)
 
-        if self.symbol_table.get_token(var_name) is not None:
+        if var_name in symbol_table:
             SemanticErrorHandler.error(
                 error_code=ErrorCode.DUPLICATE_ID,
                 token=node.var_node.token,
                 var_name=var_name,
             )
 
-        self.symbol_table.add_token(var_symbol)
+        symbol_table.add_token(var_symbol)
 
-    def visit_Compound(self, node: Compound) -> None:
-        """Central component that coordinates the compound statements (assigments and
-        writeln statement) and calls the methods according to their type.
+    def check_Assign(self, node: Assign) -> None:
+        """Stores the type of the value assigned to the variable, used to validate the
+        operations where the variable is an operand.
 
         Args:
-            node (Compound): node containing all of the compound statements (assigments
-            and writeln statement)
+            node (Assign): node containing the assignment content, whose left and right
+            sides were already visited
         """
 
-        for child in node.children:
-            self.visit(child)
-
-    def visit_Assign(self, node: Assign) -> None:
-        """Search the variable of the assigment in the Symbol Table and verify if it exists,
-        if found triggers the next symbol (if it exists), else show an error stating that
-        the variable has not been declared.
+        # The unary operators are walked past without removing them from the tree,
+        # which is still evaluated or compiled after this check
+        value = node.right
+        if value is not None and type(value) is not BinaryOperator:
+            while type(value) is UnaryOperator:
+                value = value.expression
 
-        Args:
-            node (Assign): node containing the assignment content
-        """
+            self.GLOBAL_MEMORY[node.left.value] = value.token.type
 
-        self.visit(node.left)
-        self.visit(node.right)
-
-        if node.right is not None and not isinstance(node.right, BinaryOperator):
-            while isinstance(node.right, UnaryOperator):
-                node.right = node.right.expression
-
-            self.GLOBAL_MEMORY[node.left.value] = node.right.token.type
-
-    def visit_Var(self, node: Var) -> None:
-        """ "Search the variable in the Symbol Table and verify if it exists, if not found
-        shows an error stating has not been declared.
+    def check_Var(self, node: Var) -> None:
+        """Shows an error if the variable has not been declared.
 
         Args:
             node (Var): variable token
         """
 
         var_name = node.value
-        var_symbol = self.symbol_table.get_token(var_name)
+        var_symbol = node._symbol = self.symbol_table.get_token(var_name)
 
         if var_symbol is None:
             SemanticErrorHandler.error(
                 error_code=ErrorCode.ID_NOT_FOUND, token=node.token, var_name=var_name
             )
 
-    def visit_BinaryOperator(self, node: BinaryOperator) -> None:
-        """Calls the methods according to the value of the nodes that are to the left and
-        right of the expression.
+    def check_BinaryOperator(self, node: BinaryOperator) -> None:
+        """Checks the division by zero and if the types of the operands are allowed in
+        a binary operation.
 
         Args:
-            node (BinaryOperator): node containing the node with binary operations
+            node (BinaryOperator): node with binary operations whose operands were
+            already visited
         """
 
-        self.visit(node.left)
-        self.visit(node.right)
+        left, right = node.left, node.right
+        left_type, right_type = type(left), type(right)
 
         # Zero division
-        if isinstance(node.right, Num) and node.right.value == 0:
-            while isinstance(node.left, UnaryOperator):
-                node.left = node.left.expression
-            SemanticErrorHandler.error_zero_division(node.left.value)
+        if right_type is Num and right.value == 0:
+            dividend = left
+            while type(dividend) is UnaryOperator:
+                dividend = dividend.expression
+            SemanticErrorHandler.error_zero_division(dividend.value)
+
+        left_checked = left_type in _SYMBOL_OPERANDS
+        right_checked = right_type in _SYMBOL_OPERANDS
+        if not (left_checked or right_checked):
+            # Numbers and operations have no symbol to check
+            return
+
+        # Each operand is looked up in the Symbol Table only once and both checks
+        # reuse the symbols instead of searching them again
+        left_symbol = self._operand_symbol(left)
+        right_symbol = self._operand_symbol(right)
+
+        if left_checked:
+            self._check_operand(left, left_symbol, right, right_symbol, is_left=True)
+        if right_checked:
+            self._check_operand(right, right_symbol, left, left_symbol, is_left=False)
+
+    def _operand_symbol(self, operand: AST) -> Optional[VarSymbol]:
+        """Gets the symbol of an operand of a binary operation.
 
-        if isinstance(node.left, (Var, Boolean, String)):
-            left_symbol = self.symbol_table.get_token(node.left.value)
+        Args:
+            operand (AST): an already visited operand. The variables were resolved by
+            check_Var when they were visited
 
-            if left_symbol is None:
-                SemanticErrorHandler.type_error(
-                    node.left.token.type.name, token=node.left.token
-                )
+        Returns:
+            Optional[VarSymbol]: the symbol, or None if the operand has no symbol
+        """
 
-            left_symbol_token = self.GLOBAL_MEMORY[left_symbol.name]
-            variable_type_not_allowed = not self.type_checker.is_allowed_type(
-                Context.BIN_OP, left_symbol.type.name
-            )
-            value_type_not_allowed = not self.type_checker.is_allowed_type(
-                Context.BIN_OP, left_symbol_token.name
+        if type(operand) is Var:
+            return operand._symbol
+        if type(operand) in _LITERAL_OPERANDS:
+            return self.symbol_table.get_token(operand.value)
+        return None
+
+    def _check_operand(
+        self,
+        operand: Union[Var, Boolean, String],
+        operand_symbol: Optional[VarSymbol],
+        other: AST,
+        other_symbol: Optional[VarSymbol],
+        is_left: bool,
+    ) -> None:
+        """Shows an error if the operand of a binary operation has no symbol or if its
+        declared type, or the type of the value assigned to it, cannot be used in
+        the operation.
+
+        Args:
+            operand (Union[Var, Boolean, String]): the checked operand
+            operand_symbol (Optional[VarSymbol]): symbol of the checked operand
+            other (AST): the operand on the other side of the operator
+            other_symbol (Optional[VarSymbol]): symbol of the other operand
+            is_left (bool): True if the checked operand is on the left of the operator
+        """
+
+        if operand_symbol is None:
+            SemanticErrorHandler.type_error(
+                operand.token.type.name, token=operand.token
             )
 
-            if variable_type_not_allowed or value_type_not_allowed:
-                if node.right.token.type == TokenType.ID:
-                    right_symbol = self.symbol_table.get_token(node.right.value)
-                    right_var_type = right_symbol.type.name
-                else:
-                    right_var_type = node.right.token.type.value
+        operand_value_type = self._value_type(operand_symbol)
+        variable_type_not_allowed = operand_symbol.type_name not in _BIN_OP_TYPES
+        value_type_not_allowed = operand_value_type not in _BIN_OP_TYPES
+
+        if variable_type_not_allowed or value_type_not_allowed:
+            # The variables are the operands built from ID tokens
+            if type(other) is Var:
+                other_type = other_symbol.type_name
+            else:
+                other_type = other.token.type.value
 
-                if value_type_not_allowed:
-                    left_var_type = left_symbol_token.name
-                else:
-                    left_var_type = left_symbol.type.name
+            if value_type_not_allowed:
+                operand_type = operand_value_type
+            else:
+                operand_type = operand_symbol.type_name
 
+            if is_left:
                 SemanticErrorHandler.type_error(
-                    left_var_type, right_var_type, token=node.left.token
+                    operand_type, other_type, token=operand.token
                 )
-
-        if isinstance(node.right, (Var, Boolean, String)):
-            right_symbol = self.symbol_table.get_token(node.right.value)
-
-            if right_symbol is None:
+            else:
                 SemanticErrorHandler.type_error(
-                    node.right.token.type.name, token=node.right.token
+                    other_type, operand_type, token=operand.token
                 )
 
-            right_symbol_token = self.GLOBAL_MEMORY[right_symbol.name]
-            variable_type_not_allowed = not self.type_checker.is_allowed_type(
-                Context.BIN_OP, right_symbol.type.name
-            )
-            value_type_not_allowed = not self.type_checker.is_allowed_type(
-                Context.BIN_OP, right_symbol_token.name
-            )
+    def _value_type(self, symbol: VarSymbol) -> str:
+        """Gets the name of the type of the value held by a variable.
 
-            if variable_type_not_allowed or value_type_not_allowed:
-                if node.left.token.type == TokenType.ID:
-                    left_symbol = self.symbol_table.get_token(node.left.value)
-                    left_var_type = left_symbol.type.name
-                else:
-                    left_var_type = node.left.token.type.value
+        Args:
+            symbol (VarSymbol): symbol of the variable
 
-                if value_type_not_allowed:
-                    right_var_type = right_symbol_token.name
-                else:
-                    right_var_type = right_symbol.type.name
+        Returns:
+            str: type of the last literal assigned to the variable, or its declared
+            type when it holds the result of an operation or was never assigned
+        """
 
-                SemanticErrorHandler.type_error(
-                    left_var_type, right_var_type, token=node.right.token
-                )
+        value_type = self.GLOBAL_MEMORY.get(symbol.name)
+        if value_type is None:
+            return symbol.type_name
+        return value_type.name
 
-    def visit_UnaryOperator(self, node: UnaryOperator) -> None:
-        """Calls the method that performs the Unary Operations.
+    def check_UnaryOperator(self, node: UnaryOperator) -> None:
+        """Checks if the type of the operand, and the type of the value assigned to
+        it, are allowed in an unary operation.
 
         Args:
-            node (UnaryOperator): node containing a Unary Operation
+            node (UnaryOperator): node containing a Unary Operation whose operand was
+            already visited
         """
 
-        self.visit(node.expression)
-
-        if isinstance(node.expression, (Var, Boolean, String)):
-            expr_symbol = self.symbol_table.get_token(node.expression.value)
+        if type(node.expression) in _SYMBOL_OPERANDS:
+            if type(node.expression) is Var:
+                expr_symbol = node.expression._symbol
+            else:
+                expr_symbol = self.symbol_table.get_token(node.expression.value)
 
             if expr_symbol is None:
                 SemanticErrorHandler.type_error(
                     node.expression.token.type.name, token=node.expression.token
                 )
 
-            if not self.type_checker.is_allowed_type(
-                Context.UN_OP, expr_symbol.type.name
-            ):
-                SemanticErrorHandler.type_error(
-                    expr_symbol.type.name, token=node.expression.token
-                )
+            # The value is checked too, the declared type does not stop a variable
+            # from holding a STRING or a BOOLEAN
+            for expr_type in (expr_symbol.type_name, self._value_type(expr_symbol)):
+                if expr_type not in _UN_OP_TYPES:
+                    SemanticErrorHandler.type_error(
+                        expr_type, token=node.expression.token
+                    )
 
-    def visit_Writeln(self, node: Writeln) -> None:
-        """Calls the methods according to content type and check if they are valid.
+    def check_Writeln(self, node: Writeln) -> None:
+        """Checks if the types of the writeln content can be combined.
 
         Args:
             node (Writeln): content passed in the command writeln
         """
 
-        for index, item in enumerate(node.content):
-            previous_content = node.content[index - 1]
-            if previous_content == item:
-                self.visit(item)
-            elif isinstance(
-                previous_content, (UnaryOperator, BinaryOperator)
-            ) and not self.type_checker.is_allowed_type(Context.BIN_OP, item.value):
-                node_name = previous_content.__class__.__name__
+        content = node.content
+        if not content:
+            return
+
+        # Each item is compared with the previous one around the list, so a literal
+        # is rejected both after and before an operation
+        previous_content = content[-1]
+        for item in content:
+            previous_type = type(previous_content)
+            if (
+                previous_content is not item
+                and previous_type in _OPERATIONS
+                and item.value not in _BIN_OP_TYPES
+            ):
+                item_token = item.token
                 SemanticErrorHandler.type_error(
-                    node_name, item.token.type.name, token=item.token
+                    previous_type.__name__, item_token.type.name, token=item_token
                 )
-
-    def visit_Num(self, node: Num) -> None:
-        pass
-
-    def visit_String(self, node: String) -> None:
-        pass
-
-    def visit_Boolean(self, node: Boolean) -> None:
-        pass
-
-    def visit_Empty(self, node: Empty) -> None:
-        pass
+            previous_content = item
@@ -10,15 +10,23 @@
 #                                                                                           #
 # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
 
-from typing import Union, Optional, Any
-from collections import OrderedDict
+from typing import Dict, Union, Optional
 
 from .symbols import BuiltinTypeSymbol, VarSymbol
 
 
 class SymbolTable:
+    __slots__ = ("_symbols",)
+
+    # The primitive types are fixed, so their symbols are built once and shared by
+    # every table
+    _BUILTIN_TYPES: Dict[str, BuiltinTypeSymbol] = {
+        name: BuiltinTypeSymbol(name)
+        for name in ("INTEGER", "REAL", "STRING", "BOOLEAN")
+    }
+
     def __init__(self) -> None:
-        self._symbols = OrderedDict()
+        self._symbols: Dict[str, Union[BuiltinTypeSymbol, VarSymbol]] = {}
         self.__init_builtins()
 
     def __str__(self) -> str:
@@ -28,7 +36,7 @@ class SymbolTable:
             str: the symbol the table formatted
         """
 
-        return self._format_symbol_table_content("Symbol table", self._symbols.items())
+        return self._format_symbol_table_content("Symbol table", as_items=True)
 
     __repr__ = __str__
 
@@ -39,15 +47,12 @@ class SymbolTable:
             str: the list of tokens formatted
         """
 
-        return self._format_symbol_table_content("Tokens", self._symbols.keys())
+        return self._format_symbol_table_content("Tokens", as_items=False)
 
     def __init_builtins(self) -> None:
         """Initialize the primitive types."""
 
-        self.add_token(BuiltinTypeSymbol("INTEGER"))
-        self.add_token(BuiltinTypeSymbol("REAL"))
-        self.add_token(BuiltinTypeSymbol("STRING"))
-        self.add_token(BuiltinTypeSymbol("BOOLEAN"))
+        self._symbols.update(self._BUILTIN_TYPES)
 
     def add_token(self, symbol):  # type: (Union[BuiltinTypeSymbol, VarSymbol])-> None
         """Add a new symbol in the table.
@@ -71,12 +76,37 @@ class SymbolTable:
         symbol = self._symbols.get(name)
         return symbol
 
-    def _format_symbol_table_content(self, title: str, symbols: Any) -> str:
+    def get_type_token(self, name: str) -> Optional[BuiltinTypeSymbol]:
+        """Get the symbol of a primitive type by name.
+
+        Args:
+            name (str): name of the primitive type
+
+        Returns:
+            Optional[BuiltinTypeSymbol]: the found symbol
+        """
+
+        return self._BUILTIN_TYPES.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        """Checks if a symbol is in the table.
+
+        Args:
+            name (str): name of the symbol
+
+        Returns:
+            bool: True if the table has a symbol with the name
+        """
+
+        return name in self._symbols
+
+    def _format_symbol_table_content(self, title: str, as_items: bool) -> str:
         """Format the symbol table content.
 
         Args:
             title (str): title of the content that will be displayed
-            symbols (Any): symbol table items or keys
+            as_items (bool): True to display the symbols with their values,
+            False to display only their names
 
         Returns:
             str: formatted content
@@ -84,10 +114,10 @@ class SymbolTable:
 
         header = f"\t\t:::: {title} ::::"
         lines = ["\n", header, "__" * len(header)]
-        if type(symbols).__name__ == "odict_items":
+        if as_items:
             lines.extend((f"| {key}: {value}") for key, value in self._symbols.items())
-        elif type(symbols).__name__ == "odict_keys":
-            lines.extend((f"| {key}") for key in self._symbols.keys())
+        else:
+            lines.extend((f"| {key}") for key in self._symbols)
 
         lines.append("\n")
         formatted_content = "\n".join(lines)
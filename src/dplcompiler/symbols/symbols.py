@@ -15,6 +15,8 @@ from typing import Optional
 
 
 class Symbol:
+    __slots__ = ("name", "type")
+
     def __init__(
         self, name, type=None
     ):  # type: (str, Optional[BuiltinTypeSymbol]) -> None
@@ -32,6 +34,8 @@ class BuiltinTypeSymbol(Symbol):
                                         BOOLEAN
     """
 
+    __slots__ = ()
+
     def __init__(self, name: str) -> None:
         super().__init__(name)
 
@@ -50,10 +54,14 @@ class VarSymbol(Symbol):
         type (Optional[BuiltinTypeSymbol]): variable type object.
     """
 
+    __slots__ = ("type_name",)
+
     def __init__(self, name, type):  # type: (str, Optional[BuiltinTypeSymbol]) -> None
         super().__init__(name, type)
+        # The name of the type is read on every check of the variable in an operation
+        self.type_name: Optional[str] = None if type is None else type.name
 
-    def __str__(self):
+    def __str__(self) -> str:
         return f"<{self.__class__.__name__}>(name='{self.name}', type='{self.type}')"
 
     __repr__ = __str__
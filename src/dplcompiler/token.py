@@ -23,19 +23,23 @@ class Token:
         column (Optional[int], optional): column where the token is. Defaults to None.
     """
 
+    __slots__ = ("type", "value", "line", "column", "_str")
+
     def __init__(
         self,
         type: Any,
         value: Union[str, float, int, None],
         line: Optional[int] = None,
         column: Optional[int] = None,
-    ):
+    ) -> None:
         self.type = type
         self.value = value
         self.line = line
         self.column = column
+        # Description of the token, formatted on the first request
+        self._str: Optional[str] = None
 
-    def __str__(self):
+    def __str__(self) -> str:
         """String representation of the class instance.
 
         Examples:
@@ -45,7 +49,11 @@ class Token:
         Returns:
             str: token description
         """
-        return f"Token({self.type}, {repr(self.value)}, position={self.line}:{self.column})"
-
-    def __repr__(self):
-        return self.__str__()
+        description = self._str
+        if description is None:
+            description = self._str = (
+                f"Token({self.type}, {self.value!r}, position={self.line}:{self.column})"
+            )
+        return description
+
+    __repr__ = __str__
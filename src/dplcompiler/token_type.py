@@ -14,6 +14,11 @@ from enum import Enum
 
 
 class TokenType(Enum):
+    # The members are singletons compared by identity, so they are hashed by identity
+    # too. Enum hashes the member name in Python, which made every lookup of a token
+    # type in a set or dictionary (the dispatch tables) call back into Python.
+    __hash__ = object.__hash__
+
     PLUS = "+"
     MINUS = "-"
     MUL = "*"
@@ -17,13 +17,33 @@
 #                                                                                         #
 # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
 
-from typing import Optional, List
+import re
+import sys
+
+from functools import partial
+from typing import Callable, FrozenSet, NoReturn, Optional, List
 
 from token import Token
 from token_type import TokenType
 
 from exceptions import TokenizerErrorHandler
 
+_UNDER_SCORE = TokenType.UNDER_SCORE.value
+_COLON = TokenType.COLON.value
+_ASSIGN = TokenType.ASSIGN.value
+
+# Whitespaces and numbers are matched by the (C implemented) regex engine
+_WHITESPACE_RE = re.compile(r"\s*")
+# A number starts with a digit and may have a fractional part, possibly empty ("4.")
+_NUMBER_RE = re.compile(r"\d+(?:\.\d*)?")
+
+_ASCII_SIZE = 128
+
+# The EOF token has no position, so a single instance is shared by all the tokenizers.
+# The other fixed tokens (keywords and single characters) are still created per use,
+# as their line and column are shown in the error messages
+_EOF_TOKEN = Token(type=TokenType.EOF, value=None)
+
 
 def _get_reserved_keywords() -> dict:
     """Create a dictionary of reserved keywords.
@@ -43,24 +63,149 @@ def _get_reserved_keywords() -> dict:
     return reserved_keywords
 
 
-def _get_single_characters() -> List[str]:
-    """Create a list of all supported special characters.
+def _get_single_characters() -> FrozenSet[str]:
+    """Create a set of all supported special characters.
 
     Returns:
-        List[str]: list containing all special characters
+        FrozenSet[str]: set containing all special characters
     """
 
     token_type_list = list(TokenType)
     start_index = token_type_list.index(TokenType.PLUS)
     end_index = token_type_list.index(TokenType.RBRACE)
 
-    singles_characters = [
+    singles_characters = frozenset(
         toke_type.value for toke_type in token_type_list[start_index : end_index + 1]
-    ]
+    )
 
     return singles_characters
 
 
+def _get_character_class_re(predicate: Callable[[str], bool]) -> "re.Pattern[str]":
+    """Create a regex matching a run of the ASCII characters of a class, so the regex
+    engine scans the run instead of a Python loop calling a str method per character.
+
+    Args:
+        predicate (Callable[[str], bool]): test of the characters of the class
+
+    Returns:
+        re.Pattern[str]: compiled regex of the character class
+    """
+
+    characters = "".join(
+        chr(code) for code in range(_ASCII_SIZE) if predicate(chr(code))
+    )
+    return re.compile(f"[{re.escape(characters)}]*")
+
+
+_IDENTIFIER_RE = _get_character_class_re(
+    lambda character: character.isalnum() or character == _UNDER_SCORE
+)
+_SINGLE_CHARACTERS = _get_single_characters()
+_SINGLE_CHARACTER_TOKEN_TYPES = {
+    character: TokenType(character) for character in _SINGLE_CHARACTERS
+}
+_STRING_RE = _get_character_class_re(
+    lambda character: character.isalpha() or character in _SINGLE_CHARACTERS
+)
+
+
+def _scan_identifier(source_code: str, pos: int) -> int:
+    """Scan the characters of an identifier. The ASCII runs are matched by the regex
+    engine and only non-ASCII characters are tested in Python.
+
+    Args:
+        source_code (str): the source code
+        pos (int): index where the identifier starts
+
+    Returns:
+        int: index of the first character after the identifier
+    """
+
+    end = len(source_code)
+    while True:
+        pos = _IDENTIFIER_RE.match(source_code, pos).end()
+        if (
+            pos < end
+            and ord(source_code[pos]) >= _ASCII_SIZE
+            and source_code[pos].isalnum()
+        ):
+            pos += 1
+        else:
+            return pos
+
+
+def _scan_string_characters(
+    source_code: str, pos: int, single_characters: FrozenSet[str]
+) -> int:
+    """Scan a run of characters allowed in a literal string (letters and special
+    characters). The ASCII runs are matched by the regex engine and only non-ASCII
+    characters are tested in Python.
+
+    Args:
+        source_code (str): the source code
+        pos (int): index where the run starts
+        single_characters (FrozenSet[str]): the special characters
+
+    Returns:
+        int: index of the first character after the run
+    """
+
+    end = len(source_code)
+    while True:
+        pos = _STRING_RE.match(source_code, pos).end()
+        if pos < end and ord(source_code[pos]) >= _ASCII_SIZE:
+            character = source_code[pos]
+            if character.isalpha() or character in single_characters:
+                pos += 1
+                continue
+        return pos
+
+
+def _get_character_handlers(tokenizer: type) -> List[Callable]:
+    """Create the table of handlers of the ASCII characters, indexed by the character
+    code. The characters are classified in the same order the tokens are tried: first
+    whitespaces and comments, then identifiers, strings, numbers and the single
+    characters.
+
+    Args:
+        tokenizer (type): the Tokenizer class, whose methods are the handlers
+
+    Returns:
+        List[Callable]: the handler of each ASCII character
+    """
+
+    character_handlers = []
+    for code in range(_ASCII_SIZE):
+        character = chr(code)
+        if character.isspace():
+            handler = tokenizer._skip_whitespace_token
+        elif character == TokenType.LBRACE.value:
+            handler = tokenizer._skip_comment_token
+        elif character.isalpha():
+            handler = tokenizer.handle_with_id_tokens
+        elif character in ("'", '"'):
+            handler = tokenizer.string
+        elif character.isdigit():
+            handler = tokenizer.number
+        elif character == TokenType.COLON.value:
+            handler = tokenizer._colon_token
+        else:
+            token_type = _SINGLE_CHARACTER_TOKEN_TYPES.get(character)
+            if token_type is None:
+                handler = tokenizer._unknown_character_token
+            else:
+                handler = partial(
+                    tokenizer._single_character_token,
+                    token_type=token_type,
+                    value=character,
+                )
+
+        character_handlers.append(handler)
+
+    return character_handlers
+
+
 class Tokenizer:
     """Tokenizer (Lexical Analyzer)
 
@@ -69,11 +214,20 @@ class Tokenizer:
     """
 
     RESERVED_KEYWORDS = _get_reserved_keywords()
-    SINGLE_CHARACTERS = _get_single_characters()
+    # Most identifiers are ruled out as keywords by their length or first letter,
+    # without building their uppercase copy
+    KEYWORD_LENGTHS = frozenset(map(len, RESERVED_KEYWORDS))
+    KEYWORD_INITIALS = frozenset(
+        initial
+        for keyword in RESERVED_KEYWORDS
+        for initial in (keyword[0], keyword[0].lower())
+    )
+    SINGLE_CHARACTERS = _SINGLE_CHARACTERS
 
     def __init__(self, source_code: str) -> None:
         self.source_code = source_code  # Source code
         self.pos = 0  # self.pos is an index into self.source_code
+        self.source_end = len(source_code)  # self.pos reaches it at the end of code
         self.current_token = None
         self.current_char = self.source_code[self.pos]  # The lexeme
         # Token line and column number
@@ -88,7 +242,7 @@ class Tokenizer:
             self.t_column = 0
 
         self.pos += 1
-        if self.pos > len(self.source_code) - 1:
+        if self.pos >= self.source_end:
             self.current_char = None  # Indicates end of code
         else:
             self.current_char = self.source_code[self.pos]
@@ -104,11 +258,35 @@ class Tokenizer:
         """
 
         tokenize_pos = self.pos + 1
-        if tokenize_pos > len(self.source_code) - 1:
+        if tokenize_pos >= self.source_end:
             return None
         else:
             return self.source_code[tokenize_pos]
 
+    def _move_to(self, pos: int) -> None:
+        """Move the 'pos' pointer forward to a position found by a local scan, updating
+        the 'current_char' variable and the line and column counters as if 'advance'
+        had been called for each character.
+
+        Args:
+            pos (int): index into self.source_code where the scan stopped
+        """
+
+        source_code = self.source_code
+        source_end = self.source_end
+        start = self.pos
+        last = min(pos, source_end - 1)
+
+        newline = source_code.rfind("\n", start, pos)
+        if newline == -1:
+            self.t_column += last - start
+        else:
+            self.t_line += source_code.count("\n", start, pos)
+            self.t_column = last - newline
+
+        self.pos = pos
+        self.current_char = source_code[pos] if pos < source_end else None
+
     def handle_with_id_tokens(self) -> Token:
         """Handle identifiers and reserved keyboards.
 
@@ -116,39 +294,42 @@ class Tokenizer:
             Token: the tokens representing a reserved keyword
         """
 
-        token = Token(type=None, value=None, line=self.t_line, column=self.t_column)
+        line, column = self.t_line, self.t_column
 
-        value = ""
-        while (
-            self.current_char is not None
-            and self.current_char.isalnum()
-            or self.current_char == TokenType.UNDER_SCORE.value
-        ):
-            value += self.current_char
-            self.advance()
+        # The identifier is scanned forward and sliced out of the source code
+        source_code = self.source_code
+        pos = _scan_identifier(source_code, self.pos)
 
-        token_type = self.RESERVED_KEYWORDS.get(value.upper())
-        if token_type is None:
-            token.type = TokenType.ID
-            token.value = value
-        else:
-            token.type = token_type
-            token.value = value.upper()
+        value = source_code[self.pos : pos]
+        self._move_to(pos)
 
-        return token
+        # Non ASCII identifiers always take the lookup, as they may uppercase to ASCII
+        if not value.isascii() or (
+            len(value) in self.KEYWORD_LENGTHS and value[0] in self.KEYWORD_INITIALS
+        ):
+            keyword = value.upper()
+            token_type = self.RESERVED_KEYWORDS.get(keyword)
+            if token_type is not None:
+                return Token(type=token_type, value=keyword, line=line, column=column)
+
+        # Identifiers are interned, so the dictionary lookups keyed by them (memory,
+        # Symbol Table) find the same string object and compare by identity
+        return Token(
+            type=TokenType.ID, value=sys.intern(value), line=line, column=column
+        )
 
     def skip_whitespace(self) -> None:
         """Skip whitespaces in the code"""
 
-        while self.current_char is not None and self.current_char.isspace():
-            self.advance()
+        self._move_to(_WHITESPACE_RE.match(self.source_code, self.pos).end())
 
     def skip_comment(self) -> None:
         """Skip code comments"""
 
-        while self.current_char != "}":
-            self.advance()
-        self.advance()
+        source_code = self.source_code
+        end = source_code.find("}", self.pos)
+
+        self._move_to(self.source_end if end == -1 else end + 1)
 
     def number(self) -> Token:
         """Return a (multidigit) integer or float consumed from the input.
@@ -157,64 +338,149 @@ class Tokenizer:
             Token: a token represeting a number in an expression
         """
 
-        token = Token(type=None, value=None, line=self.t_line, column=self.t_column)
-
-        value = ""
-        while self.current_char is not None and self.current_char.isdigit():
-            value += self.current_char
-            self.advance()
-
-        if self.current_char == ".":
-            value += self.current_char
-            self.advance()
+        line, column = self.t_line, self.t_column
 
-            while self.current_char is not None and self.current_char.isdigit():
-                value += self.current_char
-                self.advance()
+        match = _NUMBER_RE.match(self.source_code, self.pos)
+        value = match.group()
+        self._move_to(match.end())
 
-            token.type = TokenType.REAL_CONST
-            token.value = float(value)
-        else:
-            token.type = TokenType.INTEGER_CONST
-            token.value = int(value)
+        if "." in value:
+            return Token(
+                type=TokenType.REAL_CONST, value=float(value), line=line, column=column
+            )
 
-        return token
+        return Token(
+            type=TokenType.INTEGER_CONST, value=int(value), line=line, column=column
+        )
 
     def string(self) -> Token:
         """Return a literal string token (STRING_CONST).
 
         Returns:
             Token: a token representing a literal string.
+
+        Raises:
+            TokenizeError: when the string is not closed before the end of code
         """
 
-        token = Token(type=None, value=None, line=self.t_line, column=self.t_column)
+        line, column = self.t_line, self.t_column
 
-        self.advance()
+        source_code = self.source_code
+        end = self.source_end
+        single_characters = self.SINGLE_CHARACTERS
 
-        value = ""
-        while (
-            self.current_char is not None
-            and self.current_char.isalpha()
-            or self.current_char in self.SINGLE_CHARACTERS
-        ):
-            value += self.current_char
-            self.advance()
+        # Skip the opening quote; the characters are sliced in runs and each run of
+        # whitespaces that follows one becomes a single space
+        pos = self.pos + 1
+        parts = []
+        while True:
+            start = pos
+            pos = _scan_string_characters(source_code, pos, single_characters)
 
-            if self.current_char.isspace():
-                value += " "
-                self.skip_whitespace()
+            if pos == start:
+                break
+            parts.append(source_code[start:pos])
 
-        self.advance()
+            whitespace_end = _WHITESPACE_RE.match(source_code, pos).end()
+            if whitespace_end != pos:
+                parts.append(" ")
+                pos = whitespace_end
+
+        # A string reaching the end of code has no closing quote
+        if pos >= end:
+            TokenizerErrorHandler.error(source_code[self.pos], line, column)
+
+        # Skip the closing quote
+        self._move_to(pos + 1)
+
+        return Token(
+            type=TokenType.STRING_CONST, value="".join(parts), line=line, column=column
+        )
+
+    def _skip_whitespace_token(self) -> None:
+        """Character handler of whitespaces, which produce no token."""
 
-        token.type = TokenType.STRING_CONST
-        token.value = value
+        self.skip_whitespace()
+
+    def _skip_comment_token(self) -> None:
+        """Character handler of '{', which starts a comment and produces no token. The
+        '{' itself is skipped by the search for the closing '}'.
+        """
+
+        self.skip_comment()
+
+    def _colon_token(self) -> Token:
+        """Character handler of ':', which is either the COLON or the ASSIGN token.
+
+        Returns:
+            Token: the COLON or ASSIGN token
+        """
+
+        if self.tokenize_assign_statements() != "=":
+            return self._single_character_token(TokenType.COLON, _COLON)
+
+        token = Token(TokenType.ASSIGN, _ASSIGN, self.t_line, self.t_column)
+        self._move_to(self.pos + 2)
+        return token
+
+    def _single_character_token(self, token_type: TokenType, value: str) -> Token:
+        """Return the token of a single character and advance past it.
+
+        Args:
+            token_type (TokenType): type of the token represented by the character
+            value (str): the character, resolved once from token_type.value
+
+        Returns:
+            Token: the single character token
+        """
 
+        token = Token(token_type, value, self.t_line, self.t_column)
+        self.advance()
         return token
 
+    def _unknown_character_token(self) -> NoReturn:
+        """Character handler of characters not found in the grammar.
+
+        Raises:
+            TokenizeError: the current character is not found in the grammar
+        """
+
+        TokenizerErrorHandler.error(self.current_char, self.t_line, self.t_column)
+
+    def _non_ascii_token(self) -> Optional[Token]:
+        """Character handler of the non-ASCII characters, which are classified by the
+        str methods instead of the dispatch table.
+
+        Returns:
+            Optional[Token]: the token starting at the current character, or None when
+            the character is a whitespace
+        """
+
+        if self.current_char.isspace():
+            return self._skip_whitespace_token()
+
+        if self.current_char.isalpha():
+            return self.handle_with_id_tokens()
+
+        # Only the decimal digits start a number, the same ones \d matches. Other
+        # digits, like '²', are unknown characters.
+        if self.current_char.isdecimal():
+            return self.number()
+
+        token_type = _SINGLE_CHARACTER_TOKEN_TYPES.get(self.current_char)
+        if token_type is None:
+            self._unknown_character_token()
+
+        return self._single_character_token(token_type, self.current_char)
+
     def get_next_token(self) -> Token:
         """Here the Lexical Analysis will take place, so the sentences will be broken
         one at a time into smaller parts
 
+        The handler of each ASCII character is looked up by its code in a table built
+        once, instead of testing the character against each kind of token. Handlers
+        that only skip characters (whitespaces and comments) return None.
+
         Returns:
             Token: the Token object with all informations about the found token
 
@@ -222,50 +488,18 @@ class Tokenizer:
             ValueError: a TokenizeError when the current_token is not found in the grammar
         """
 
+        character_handlers = _CHARACTER_HANDLERS
         while self.current_char is not None:
-            if self.current_char.isspace():
-                self.skip_whitespace()
-                continue
-
-            if self.current_char == "{":
-                self.advance()
-                self.skip_comment()
-                continue
-
-            if self.current_char.isalpha():
-                return self.handle_with_id_tokens()
-
-            if self.current_char in ["'", '"']:
-                return self.string()
-
-            if self.current_char.isdigit():
-                return self.number()
+            code = ord(self.current_char)
+            if code < _ASCII_SIZE:
+                token = character_handlers[code](self)
+            else:
+                token = self._non_ascii_token()
 
-            if self.current_char == ":" and self.tokenize_assign_statements() == "=":
-                token = Token(
-                    type=TokenType.ASSIGN,
-                    value=TokenType.ASSIGN.value,
-                    line=self.t_line,
-                    column=self.t_column,
-                )
-                self.advance()
-                self.advance()
+            if token is not None:
                 return token
 
-            try:
-                token_type = TokenType(self.current_char)
-            except ValueError:
-                TokenizerErrorHandler.error(
-                    self.current_char, self.t_line, self.t_column
-                )
-            else:
-                token = Token(
-                    type=token_type,
-                    value=token_type.value,
-                    line=self.t_line,
-                    column=self.t_column,
-                )
-                self.advance()
-                return token
+        return _EOF_TOKEN
+
 
-        return Token(type=TokenType.EOF, value=None)
+_CHARACTER_HANDLERS = _get_character_handlers(Tokenizer)
@@ -1,19 +1,28 @@
+from typing import FrozenSet
+
 from token_type import TokenType
 from context import Context
-from symbols import VarSymbol
 
+_NUMERIC_TYPES = frozenset(
+    {
+        TokenType.INTEGER.value,
+        TokenType.INTEGER_CONST.value,
+        TokenType.REAL.value,
+        TokenType.REAL_CONST.value,
+    }
+)
+
+
+def allowed_types(context: Context) -> FrozenSet[str]:
+    """Gets the names of the types accepted by an operation.
 
-class TypeChecker:
-    def is_allowed_type(self, context: Context, variable_type: VarSymbol) -> bool:
-        if context == Context.BIN_OP or Context.UN_OP:
-            allowed_types = [
-                TokenType.INTEGER.value,
-                TokenType.INTEGER_CONST.value,
-                TokenType.REAL.value,
-                TokenType.REAL_CONST.value,
-            ]
+    Args:
+        context (Context): operation where the types are used (BIN_OP or UN_OP)
 
-            if variable_type in allowed_types:
-                return True
+    Returns:
+        FrozenSet[str]: names of the accepted types, empty for the other contexts
+    """
 
-        return False
+    if context is Context.BIN_OP or context is Context.UN_OP:
+        return _NUMERIC_TYPES
+    return frozenset()
@@ -13,8 +13,27 @@
 #                                                                                       #
 # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # # #
 
+from typing import Callable, Dict
+
+import AST
+
 
 class NodeVisitor:
+    def __init__(self) -> None:
+        """Binds the visit_* methods of the instance once, keyed by the AST node class
+        they handle, so each visit is a lookup of the bound method in the table
+        followed by a direct call. The visitors call it from their __init__.
+        """
+
+        dispatch: Dict[type, Callable] = {}
+        for name in dir(type(self)):
+            if name.startswith("visit_"):
+                node_class = getattr(AST, name[len("visit_") :], None)
+                if isinstance(node_class, type) and issubclass(node_class, AST.AST):
+                    dispatch[node_class] = getattr(self, name)
+
+        self._dispatch = dispatch
+
     def visit(self, node):
         """Visit each node of the tree and executes the corresponding method.
 
@@ -42,9 +61,7 @@ class NodeVisitor:
                           - visit_Compound()
                           - visit_...
         """
-        method_name = f"visit_{type(node).__name__}"
-        visitor = getattr(self, method_name, self.generic_visit)
-        return visitor(node)
+        return self._dispatch.get(type(node), self.generic_visit)(node)
 
     def generic_visit(self, node):
         """Raise a exception when the node is not found.
@@ -0,0 +1,64 @@
+import ctypes
+import os
+import sys
+
+import pytest
+
+SRC_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "dplcompiler"
+)
+
+# The compiler modules import each other as top-level scripts, as when app.py is run.
+# Its token module shadows the one of the standard library, already imported by
+# pytest, so that one is dropped and the compiler's is found first.
+sys.path.insert(0, SRC_DIR)
+sys.modules.pop("token", None)
+
+
+@pytest.fixture
+def sample_program() -> bytes:
+    """Source code of a program using every type of the language."""
+
+    return b"""PROGRAM sample;
+VAR a, b: INTEGER;
+    c: REAL;
+    s: STRING;
+    t: BOOLEAN;
+BEGIN
+    a := 3;
+    b := -2;
+    c := 2.5;
+    s := 'done';
+    t := TRUE;
+    Writeln (a + b) * 4 - 6 / 4;
+    Writeln c;
+    Writeln s;
+    Writeln t;
+END.
+"""
+
+
+@pytest.fixture
+def run_program(capfd):
+    """Compiles a program, runs it with the JIT and returns what it printed."""
+
+    from IR_evaluator import IREvaluator
+    from parser import Parser
+    from semantic_handler import SemanticHandler
+    from tokenizer import Tokenizer
+
+    libc = ctypes.CDLL(None)
+
+    def run(source_code: str, optimize: bool = False, opt_level: int = 3) -> str:
+        tree = Parser(Tokenizer(source_code)).parse()
+        evaluator = IREvaluator(tree, "program.dpl")
+        evaluator.generate_ir(SemanticHandler())
+        capfd.readouterr()
+        evaluator.evaluate(
+            optimize=optimize, llvmdump=False, opt_level=opt_level, cache=False
+        )
+        # printf writes through the buffers of the C library
+        libc.fflush(None)
+        return capfd.readouterr().out
+
+    return run
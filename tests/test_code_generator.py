@@ -0,0 +1,115 @@
+import pytest
+
+import code_generator
+from code_generator import CodeGenerator
+from exceptions import SemanticError
+from parser import Parser
+from semantic_handler import SemanticHandler
+from tokenizer import Tokenizer
+
+
+def test_variables_read_before_assignment_are_zero(run_program):
+    output = run_program("""PROGRAM p;
+        VAR i: INTEGER;
+            r: REAL;
+            s: STRING;
+            b: BOOLEAN;
+        BEGIN
+            Writeln i;
+            Writeln r;
+            Writeln s;
+            Writeln b;
+        END.""")
+
+    assert output == "0.000000\n0.000000\n\nFALSE\n"
+
+
+@pytest.mark.parametrize(
+    "statement, value_type",
+    [
+        ("c := FALSE; Writeln 2 * +c + 'hi';", "FALSE"),
+        ("c := FALSE; Writeln -c;", "FALSE"),
+        ("c := 'x'; Writeln 2 * -c;", "STRING_CONST"),
+    ],
+)
+def test_unary_operand_holding_other_type(statement, value_type):
+    source_code = f"PROGRAM p; VAR c: INTEGER; BEGIN {statement} END."
+
+    # Rejected before an instruction mixes the value with the doubles
+    with pytest.raises(SemanticError) as error_info:
+        CodeGenerator(SemanticHandler()).visit(Parser(Tokenizer(source_code)).parse())
+
+    assert error_info.value.message.startswith(
+        f"SemanticError: Unsupported type(s) of operation: {value_type}"
+    )
+
+
+def test_variable_assigned_from_an_operation(run_program):
+    output = run_program("""PROGRAM p;
+        VAR a, c: INTEGER;
+        BEGIN
+            a := 1 + 2;
+            c := -a * 2;
+            Writeln c;
+        END.""")
+
+    assert output == "-6.000000\n"
+
+
+@pytest.mark.parametrize("optimize", [False, True])
+def test_writeln_prints_each_type(run_program, sample_program, optimize):
+    output = run_program(sample_program.decode("utf-8"), optimize=optimize)
+
+    assert output == "2.500000\n2.500000\ndone\nTRUE\n"
+
+
+def test_writeln_prints_strings_and_booleans(run_program):
+    output = run_program("""PROGRAM p;
+        VAR s: STRING;
+            b: BOOLEAN;
+        BEGIN
+            s := 'Hello,   world!';
+            b := FALSE;
+            Writeln s;
+            Writeln 'literal';
+            Writeln b;
+            Writeln TRUE;
+        END.""")
+
+    assert output == "Hello, world!\nliteral\nFALSE\nTRUE\n"
+
+
+_FOLDED_PROGRAM = """PROGRAM p;
+VAR x: REAL;
+BEGIN
+    x := 2.5;
+    Writeln 1 + 2 * 3 - 4 / 8;
+    Writeln -(3 - 5) * 1.5;
+    Writeln 7 DIV 2;
+    Writeln x - (1 - 1);
+    Writeln x * 1;
+    Writeln 1 * x;
+    Writeln x / 1;
+    Writeln 1 / (1 - 1);
+    Writeln 0.1 + 0.2;
+END."""
+
+
+def test_folded_constants_print_the_same(run_program, monkeypatch):
+    folded = run_program(_FOLDED_PROGRAM)
+
+    monkeypatch.setattr(code_generator, "_fold_binary_operation", lambda *_: None)
+    emitted = run_program(_FOLDED_PROGRAM)
+
+    assert folded == emitted
+    assert folded.splitlines() == [
+        "6.500000",
+        "3.000000",
+        "3.500000",
+        "2.500000",
+        "2.500000",
+        "2.500000",
+        "2.500000",
+        "inf",
+        "0.300000",
+    ]
@@ -0,0 +1,109 @@
+import os
+import shutil
+import stat
+
+from compilation_cache import CompilationCache
+from handler import Handler
+from IR_evaluator import IREvaluator
+from parser import Parser
+from semantic_handler import SemanticHandler
+from tokenizer import Tokenizer
+
+
+def _compile(source_code: bytes):
+    tree = Parser(Tokenizer(source_code.decode("utf-8"))).parse()
+    semantic_handler = SemanticHandler()
+    evaluator = IREvaluator(tree, "sample.dpl")
+    evaluator.generate_ir(semantic_handler)
+    return tree, semantic_handler.symbol_table, evaluator
+
+
+def _save(cache: CompilationCache, source_code: bytes) -> str:
+    tree, symbol_table, evaluator = _compile(source_code)
+    cache.save(tree, symbol_table, evaluator.ir_code, evaluator.func_name)
+    return evaluator.ir_code
+
+
+def test_round_trip(tmp_path, capsys, sample_program):
+    tree, symbol_table, evaluator = _compile(sample_program)
+    CompilationCache(sample_program, str(tmp_path)).save(
+        tree, symbol_table, evaluator.ir_code, evaluator.func_name
+    )
+
+    cached = CompilationCache(sample_program, str(tmp_path)).load()
+
+    assert cached is not None
+    cached_tree, cached_symbol_table, ir_code, func_name = cached
+    assert ir_code == evaluator.ir_code
+    assert func_name == evaluator.func_name
+    assert str(cached_symbol_table) == str(symbol_table)
+
+    Handler(tree).handle()
+    expected_output = capsys.readouterr().out
+    Handler(cached_tree).handle()
+    assert capsys.readouterr().out == expected_output
+
+
+def test_source_change_misses(tmp_path, sample_program):
+    _save(CompilationCache(sample_program, str(tmp_path)), sample_program)
+
+    changed_program = sample_program.replace(b"a := 3", b"a := 4")
+
+    assert CompilationCache(changed_program, str(tmp_path)).load() is None
+
+
+def test_compiler_change_misses(tmp_path, monkeypatch, sample_program):
+    compiler_dir = tmp_path / "compiler"
+    shutil.copytree(
+        CompilationCache.COMPILER_DIR,
+        compiler_dir,
+        ignore=shutil.ignore_patterns("__pycache__"),
+    )
+    monkeypatch.setattr(CompilationCache, "COMPILER_DIR", str(compiler_dir))
+    cache_dir = str(tmp_path / "cache")
+    _save(CompilationCache(sample_program, cache_dir), sample_program)
+    assert CompilationCache(sample_program, cache_dir).load() is not None
+
+    with open(compiler_dir / "code_generator.py", "a") as module:
+        module.write("\n# A change in the compiler\n")
+
+    assert CompilationCache(sample_program, cache_dir).load() is None
+
+
+def test_cache_directory_is_private(tmp_path, sample_program):
+    cache_dir = tmp_path / "cache"
+    cache = CompilationCache(sample_program, str(cache_dir))
+    _save(cache, sample_program)
+
+    assert stat.S_IMODE(os.stat(cache_dir).st_mode) == 0o700
+    assert cache.load() is not None
+
+    # Entries in a directory that others can write to are never unpickled
+    os.chmod(cache_dir, 0o777)
+    assert cache.load() is None
+
+
+def test_unusable_cache_directory_misses(tmp_path, sample_program):
+    # A directory under a regular file can be neither created nor read
+    regular_file = tmp_path / "file"
+    regular_file.write_text("")
+    cache_dir = str(regular_file / "cache")
+    cache = CompilationCache(sample_program, cache_dir)
+
+    _save(cache, sample_program)
+    assert cache.load() is None
+
+
+def test_failed_save_leaves_no_entry(tmp_path, monkeypatch, sample_program):
+    cache = CompilationCache(sample_program, str(tmp_path))
+    replace = os.replace
+
+    def failing_replace(source, destination):
+        if destination.endswith(".pkl"):
+            raise OSError("No space left on device")
+        replace(source, destination)
+
+    monkeypatch.setattr(os, "replace", failing_replace)
+    _save(cache, sample_program)
+
+    assert cache.load() is None
@@ -0,0 +1,40 @@
+import copy
+import pickle
+
+import pytest
+
+from code_generator import CodeGenerator
+from exceptions import ErrorCode, SemanticError
+from parser import Parser
+from semantic_handler import SemanticHandler
+from tokenizer import Tokenizer
+
+
+def _semantic_error(source_code: str) -> SemanticError:
+    with pytest.raises(SemanticError) as error_info:
+        CodeGenerator(SemanticHandler()).visit(Parser(Tokenizer(source_code)).parse())
+    return error_info.value
+
+
+def test_message_is_built_when_raised():
+    error = _semantic_error("PROGRAM p; VAR a: INTEGER; BEGIN b := 1; END.")
+
+    assert error.error_code is ErrorCode.ID_NOT_FOUND
+    assert error.message == f"SemanticError: {error}"
+    assert "Identifier: 'b'" in str(error)
+    assert error.args == (str(error),)
+
+
+@pytest.mark.parametrize(
+    "clone", [copy.copy, lambda error: pickle.loads(pickle.dumps(error))]
+)
+def test_errors_can_be_copied_and_pickled(clone):
+    error = _semantic_error("PROGRAM p; VAR a: INTEGER; BEGIN b := 1; END.")
+
+    cloned = clone(error)
+
+    assert type(cloned) is SemanticError
+    assert cloned.error_code is error.error_code
+    assert str(cloned.token) == str(error.token)
+    assert cloned.message == error.message
+    assert cloned.args == error.args
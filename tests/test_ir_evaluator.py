@@ -0,0 +1,124 @@
+import gc
+import os
+
+import llvmlite.binding as llvm
+import pytest
+
+from compilation_cache import CompilationCache
+from IR_evaluator import IREvaluator
+from parser import Parser
+from semantic_handler import SemanticHandler
+from tokenizer import Tokenizer
+
+
+def _evaluator(source_code: bytes) -> IREvaluator:
+    tree = Parser(Tokenizer(source_code.decode("utf-8"))).parse()
+    evaluator = IREvaluator(tree, "sample.dpl")
+    evaluator.generate_ir(SemanticHandler())
+    return evaluator
+
+
+def test_evaluators_in_the_same_process(sample_program):
+    first = _evaluator(sample_program)
+    assert first.evaluate(optimize=True, llvmdump=False, cache=False) == 0.0
+
+    # The engine of the first evaluator frees its target machine with itself, which
+    # must not be the one of any other evaluator
+    del first
+    gc.collect()
+
+    second = _evaluator(sample_program)
+    third = _evaluator(sample_program)
+    assert second.evaluate(optimize=True, llvmdump=False, cache=False) == 0.0
+    assert third.evaluate(optimize=False, llvmdump=False, cache=False) == 0.0
+    assert second.target_machine is not third.target_machine
+
+
+@pytest.fixture
+def loaded_objects(tmp_path, monkeypatch):
+    """Keeps the object cache in a temporary directory and records whether each
+    evaluation loaded its machine code from it.
+    """
+
+    monkeypatch.setattr(CompilationCache, "CACHE_DIR", str(tmp_path / "cache"))
+
+    loaded = []
+    load_object_file = IREvaluator._load_object_file
+
+    def recording_load_object_file(self, object_path):
+        entry_address = load_object_file(self, object_path)
+        loaded.append(entry_address is not None)
+        return entry_address
+
+    monkeypatch.setattr(IREvaluator, "_load_object_file", recording_load_object_file)
+    return loaded
+
+
+def _object_files():
+    return [
+        name for name in os.listdir(CompilationCache.CACHE_DIR) if name.endswith(".o")
+    ]
+
+
+def test_object_cache_round_trip(loaded_objects, sample_program):
+    assert _evaluator(sample_program).evaluate(optimize=True, llvmdump=False) == 0.0
+    assert _object_files()
+
+    assert _evaluator(sample_program).evaluate(optimize=True, llvmdump=False) == 0.0
+    assert loaded_objects == [False, True]
+    assert len(_object_files()) == 1
+
+
+def _change_cpu_features(monkeypatch):
+    features = llvm.get_host_cpu_features()
+    features["dpl-test-feature"] = True
+    monkeypatch.setattr(llvm, "get_host_cpu_features", lambda: features)
+
+
+def _change_cpu_name(monkeypatch):
+    monkeypatch.setattr(llvm, "get_host_cpu_name", lambda: "generic")
+
+
+def _change_llvm_version(monkeypatch):
+    monkeypatch.setattr(llvm, "llvm_version_info", (0, 0, 0))
+
+
+@pytest.mark.parametrize(
+    "change_host", [_change_cpu_features, _change_cpu_name, _change_llvm_version]
+)
+def test_host_change_misses(loaded_objects, monkeypatch, sample_program, change_host):
+    _evaluator(sample_program).evaluate(optimize=True, llvmdump=False)
+
+    change_host(monkeypatch)
+    _evaluator(sample_program).evaluate(optimize=True, llvmdump=False)
+
+    assert loaded_objects == [False, False]
+    assert len(_object_files()) == 2
+
+
+def test_options_change_misses(loaded_objects, sample_program):
+    _evaluator(sample_program).evaluate(optimize=True, llvmdump=False, opt_level=3)
+    _evaluator(sample_program).evaluate(optimize=True, llvmdump=False, opt_level=2)
+
+    assert loaded_objects == [False, False]
+    assert len(_object_files()) == 2
+
+
+def test_shared_directory_is_not_used(loaded_objects, sample_program):
+    _evaluator(sample_program).evaluate(optimize=True, llvmdump=False)
+    os.chmod(CompilationCache.CACHE_DIR, 0o777)
+
+    _evaluator(sample_program).evaluate(optimize=True, llvmdump=False)
+
+    assert loaded_objects == [False, False]
+
+
+def test_unusable_directory_is_not_used(tmp_path, monkeypatch, sample_program):
+    regular_file = tmp_path / "file"
+    regular_file.write_text("")
+    monkeypatch.setattr(CompilationCache, "CACHE_DIR", str(regular_file / "cache"))
+
+    evaluator = _evaluator(sample_program)
+
+    assert evaluator.evaluate(optimize=True, llvmdump=False) == 0.0
+    assert evaluator._object_path is None
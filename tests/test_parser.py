@@ -0,0 +1,32 @@
+import re
+
+import pytest
+
+_EXPRESSIONS = [
+    ("2 + 3 * 4", "14.000000"),
+    ("2 * 3 + 4", "10.000000"),
+    ("10 - 4 - 3", "3.000000"),
+    ("16 / 4 / 2", "2.000000"),
+    ("2 * (3 + 4)", "14.000000"),
+    ("-2 * 3 + 1", "-5.000000"),
+    ("1 - 2 * 3 DIV 2", "-2.000000"),
+    ("20 - 6 / 3 * 2 + 1", "17.000000"),
+]
+
+
+@pytest.mark.parametrize("expression, expected", _EXPRESSIONS)
+def test_precedence_and_associativity(run_program, expression, expected):
+    # Constants are folded while the IR is generated, variables are computed by the
+    # emitted instructions, and both follow the shape of the tree
+    with_variables = re.sub(r"\d+", r"n\g<0>", expression)
+
+    output = run_program(f"""PROGRAM p;
+        VAR n1, n2, n3, n4, n6, n10, n16, n20: INTEGER;
+        BEGIN
+            n1 := 1; n2 := 2; n3 := 3; n4 := 4;
+            n6 := 6; n10 := 10; n16 := 16; n20 := 20;
+            Writeln {expression};
+            Writeln {with_variables};
+        END.""")
+
+    assert output == f"{expected}\n{expected}\n"
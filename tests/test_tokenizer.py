@@ -0,0 +1,54 @@
+import pytest
+
+from exceptions import TokenizeError
+from token_type import TokenType
+from tokenizer import Tokenizer
+
+
+def _tokens(source_code: str):
+    tokenizer = Tokenizer(source_code)
+    tokens = []
+    while True:
+        token = tokenizer.get_next_token()
+        tokens.append(token)
+        if token.type is TokenType.EOF:
+            return tokens
+
+
+def test_non_ascii_decimal_digits_are_numbers():
+    number = _tokens("a := ٣;")[2]
+
+    assert number.type is TokenType.INTEGER_CONST
+    assert number.value == 3
+
+
+@pytest.mark.parametrize("character", ["²", "½", "→"])
+def test_other_non_ascii_characters_are_unknown(character):
+    with pytest.raises(TokenizeError) as error_info:
+        _tokens(f"a := 2{character};")
+
+    assert error_info.value.message == (
+        f"TokenizeError: Tokenize error on {character} **line: 1 **column: 7"
+    )
+
+
+@pytest.mark.parametrize(
+    "source_code",
+    ["s := 'text", "s := 'text;\n  END.", "s := '", 's := "text'],
+)
+def test_unterminated_string(source_code):
+    # Reported at the opening quote instead of returning the rest of the code
+    with pytest.raises(TokenizeError) as error_info:
+        _tokens(source_code)
+
+    quote = source_code[5]
+    assert error_info.value.message == (
+        f"TokenizeError: Tokenize error on {quote} **line: 1 **column: 6"
+    )
+
+
+def test_closed_string():
+    string = _tokens("s := 'some   text';")[2]
+
+    assert string.type is TokenType.STRING_CONST
+    assert string.value == "some text"